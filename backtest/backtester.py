@@ -1 +1,143 @@
 """Runs strategies on historical data offline without exchange"""
+import numpy as np
+import pandas as pd
+from config.settings import BACKTEST_FEE_BPS, BACKTEST_SLIPPAGE_BPS, MOMENTUM_RSI_WINDOW, MOMENTUM_VOLUME_WINDOW
+
+
+def momentum_signals(close, volume, window_rsi=MOMENTUM_RSI_WINDOW, volume_window=MOMENTUM_VOLUME_WINDOW):
+    """
+    Trader.momentum rules applied to every bar at once (1 = buy, -1 = sell, 0 = hold).
+    close/volume are per-bar arrays (e.g. 1-minute candles).
+    The MACD confirmation in Trader._momentum_signal never changes the signal, so it isn't computed here.
+    """
+    close = pd.Series(np.asarray(close, dtype=float))
+    volume = np.asarray(volume, dtype=float)
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=window_rsi).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window_rsi).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).to_numpy()
+    vol_avg = pd.Series(volume).rolling(window=volume_window).mean().to_numpy()
+
+    # NaN comparisons are False, same as the scalar checks
+    with np.errstate(invalid="ignore"):
+        signals = np.where(rsi < 30, 1, np.where(rsi > 70, -1, 0))
+        signals[volume < vol_avg] = 0
+    return signals.astype(np.int8)
+
+
+class Backtester:
+    """
+    Simulates a strategy's signals over a price series.
+
+    Position model: the signal at bar t (-1/0/1, or any target in [-1, 1]) is the position held
+    over bar t+1, traded at bar t's close. Costs are fee + slippage in bps of traded notional;
+    funding (fraction of notional per bar, longs pay when positive) is charged on the held position.
+    PnL is in return units of `size` notional (no compounding).
+
+    run() is fully vectorized; run_events() is the per-bar loop for path-dependent rules (stops, etc.).
+    """
+
+    def __init__(self, fee_bps=BACKTEST_FEE_BPS, slippage_bps=BACKTEST_SLIPPAGE_BPS, bars_per_year=525600, logger=None):
+        self.fee_bps = fee_bps
+        self.slippage_bps = slippage_bps
+        self.bars_per_year = bars_per_year  # 1-minute bars by default
+        self.logger = logger
+
+    def _costs(self, positions):
+        turnover = np.abs(np.diff(positions, prepend=0.0))
+        return turnover, turnover * (self.fee_bps + self.slippage_bps) / 1e4
+
+    def _result(self, prices, positions, funding_rates, size):
+        prices = np.asarray(prices, dtype=float)
+        positions = np.asarray(positions, dtype=float)
+
+        returns = np.zeros_like(prices)
+        returns[1:] = np.diff(prices) / prices[:-1]
+
+        held = np.zeros_like(positions)
+        held[1:] = positions[:-1]
+
+        turnover, costs = self._costs(positions)
+        pnl = held * returns - costs
+        if funding_rates is not None:
+            pnl -= held * np.asarray(funding_rates, dtype=float)
+        pnl *= size
+
+        equity = np.cumsum(pnl)
+        result = {
+            "positions": positions,
+            "pnl": pnl,
+            "equity": equity,
+            "stats": self._stats(pnl, equity, turnover, held, returns),
+        }
+        if self.logger:
+            self.logger.info(f"Backtest over {len(prices)} bars: {result['stats']}")
+        return result
+
+    def _stats(self, pnl, equity, turnover, held, returns):
+        std = pnl.std()
+        peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+        in_market = held != 0
+        winners = (held * returns)[in_market] > 0
+        return {
+            "total_return": float(equity[-1]) if len(equity) else 0.0,
+            "sharpe": float(pnl.mean() / std * np.sqrt(self.bars_per_year)) if std > 0 else 0.0,
+            "max_drawdown": float((peak - equity).max()) if len(equity) else 0.0,
+            "trades": int(np.count_nonzero(turnover)),
+            "turnover": float(turnover.sum()),
+            "exposure": float(in_market.mean()) if len(held) else 0.0,
+            "hit_rate": float(winners.mean()) if winners.size else 0.0,
+        }
+
+    def run(self, prices, signals, funding_rates=None, size=1.0):
+        """
+        Vectorized backtest. signals: array aligned with prices, or a DataFrame/Series with a
+        "signal" column (MovingAverageStrategy.generate_signals output).
+        """
+        if isinstance(signals, pd.DataFrame):
+            signals = signals["signal"]
+        positions = np.nan_to_num(np.asarray(signals, dtype=float))
+        if len(positions) != len(prices):
+            raise ValueError("prices and signals must be the same length")
+        return self._result(prices, positions, funding_rates, size)
+
+    def run_events(self, prices, on_bar, funding_rates=None, size=1.0):
+        """
+        Event-driven fallback for path-dependent rules.
+        on_bar(i, price, position, state) -> target position for the next bar; state is a dict
+        the rule can keep things in (entry price, trailing high, ...). Costs/funding as in run().
+        """
+        prices = np.asarray(prices, dtype=float)
+        positions = np.zeros_like(prices)
+        position = 0.0
+        state = {}
+
+        for i, price in enumerate(prices):
+            position = on_bar(i, price, position, state)
+            positions[i] = position
+
+        return self._result(prices, positions, funding_rates, size)
+
+
+def stop_loss_rule(signals, stop_pct):
+    """
+    Example path-dependent rule for run_events: follow signals, but go flat once price moves
+    stop_pct against the entry, until the signal changes.
+    """
+    signals = np.asarray(signals)
+
+    def on_bar(i, price, position, state):
+        target = float(signals[i])
+        if target != state.get("signal"):
+            state["signal"] = target
+            state["stopped"] = False
+            state["entry"] = price
+        if state["stopped"] or target == 0:
+            return 0.0
+        if (price - state["entry"]) / state["entry"] * np.sign(target) <= -stop_pct:
+            state["stopped"] = True
+            return 0.0
+        return target
+
+    return on_bar
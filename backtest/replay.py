@@ -0,0 +1,223 @@
+"""Replays a recorded response log (exchange/recorder.py) through DataHandler and Trader, offline"""
+import argparse
+import json
+import time
+from collections import Counter
+from datetime import timezone
+
+from config.settings import MOMENTUM_RSI_WINDOW
+from data.order_book import L2Book
+from exchange.recorder import ResponseLog
+
+
+class ReplayExchange:
+    """
+    Stands in for ExchangeWrapper behind a Trader during replay: private requests (orders) are
+    acknowledged locally and kept in self.orders instead of going to Kraken.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.orders = []  # (endpoint_path, params)
+
+    def private_request(self, endpoint_path, params=None, method="POST"):
+        self.orders.append((endpoint_path, params))
+        self.logger.debug(f"Replay: {method} {endpoint_path} {params} acknowledged locally")
+        return {"result": "success", "replay": True}
+
+
+class ReplayDriver:
+    """
+    Feeds recorded exchange responses back through the live code paths, on one thread and in
+    receive order, so a replay is deterministic:
+
+        /instruments/status, /instruments/<symbol>/status -> DataHandler.snapshot_instrument_status
+        /tickers, /tickers/<symbol>                       -> DataHandler.snapshot_tickers + Trader.momentum_tick
+        /orderbook                                        -> DataHandler.save_order_book (+ trader.books)
+        /history                                          -> DataHandler.append_trade_history
+        /instruments                                      -> DataHandler.init_instruments (load_instruments=True only)
+
+    Older /history pages (lastTime set) are merged into the symbol's newest page and appended with
+    the next newest page or at the end of the run, as MarketDataRefresher does. Private responses
+    and non-200 responses are skipped. Give the Trader a ReplayExchange so signals never reach the
+    exchange.
+
+        driver = ReplayDriver("capture/2025-09-03.krr", data_handler, Trader(ReplayExchange(log), log), log)
+        stats = driver.run(speed=100)  # None: as fast as possible
+    """
+
+    def __init__(self, log_path, data_handler, trader, logger, symbols=None, load_instruments=False,
+                 window_rsi=MOMENTUM_RSI_WINDOW):
+        self.log = ResponseLog(log_path)
+        self.data_handler = data_handler
+        self.trader = trader
+        self.logger = logger
+        self.symbols = set(symbols) if symbols else None  # trader symbols; None = every ticker
+        self.load_instruments = load_instruments          # init_instruments overwrites the table
+        self.window_rsi = window_rsi
+        self._pending_trades = {}  # symbol -> trades of the newest page + older pages
+
+    # -----------------------
+    # Dispatch
+    # -----------------------
+
+    def _dispatch(self, record, counts):
+        """Route one response to its handler; returns the handler label, None if not replayed."""
+        path = record.path
+        if path == "/tickers" or path.startswith("/tickers/"):
+            payload = record.json()
+            self.data_handler.snapshot_tickers(payload)
+            self._tick(payload, counts)
+            return "tickers"
+        if path == "/instruments/status" or (path.startswith("/instruments/") and path.endswith("/status")):
+            self.data_handler.snapshot_instrument_status(record.json())
+            return "status"
+        if path == "/orderbook":
+            symbol, payload = record.param("symbol"), record.json()
+            self.data_handler.save_order_book(symbol, payload)
+            if self.trader is not None and self.trader.books is not None:
+                self.trader.books[symbol] = L2Book.from_rest(symbol, payload)
+            return "orderbook"
+        if path == "/history":
+            self._trades(record.param("symbol"), record.json(), older=record.param("lastTime") is not None)
+            return "history"
+        if path == "/instruments" and self.load_instruments:
+            self.data_handler.init_instruments(record.json()["instruments"])
+            return "instruments"
+        return None
+
+    def _tick(self, payload, counts):
+        if self.trader is None:
+            return
+        tickers = [payload["ticker"]] if "ticker" in payload else payload.get("tickers", [])
+        for ticker in tickers:
+            symbol = ticker.get("symbol")
+            if not ticker.get("lastTime") or ticker.get("last") is None:
+                continue  # indices carry no trade price
+            if self.symbols is not None and symbol not in self.symbols:
+                continue
+            counts["ticks"] += 1
+            self.trader.momentum_tick(symbol, ticker, self.window_rsi)
+
+    def _trades(self, symbol, payload, older):
+        history = payload.get("history", [])
+        if older:
+            self._pending_trades.setdefault(symbol, []).extend(history)
+            return
+        self._flush_trades(symbol)
+        self._pending_trades[symbol] = list(history)
+
+    def _flush_trades(self, symbol=None):
+        symbols = [symbol] if symbol is not None else list(self._pending_trades)
+        for s in symbols:
+            history = self._pending_trades.pop(s, None)
+            if history:
+                self.data_handler.append_trade_history(s, {"history": history})
+
+    # -----------------------
+    # Run
+    # -----------------------
+
+    def run(self, speed=1.0, start=None, end=None):
+        """
+        Replay records with start <= receive time < end (datetimes or ns since epoch).
+        speed is the multiple of the recorded pace (1.0 = as recorded, 100 = 100x); None or 0
+        replays as fast as DataHandler and Trader keep up. Returns run stats.
+        """
+        start, end = self._ns(start), self._ns(end)
+        counts = Counter()
+        handled = Counter()  # handler label -> responses
+        first_ts = last_ts = None
+        max_lag = 0.0
+        orders = self._orders()
+        wall_start = time.perf_counter()
+
+        for record in self.log.records(start, end):
+            if first_ts is None:
+                first_ts = record.ts
+            last_ts = record.ts
+
+            if speed:
+                # sleep until the record's scheduled time; a negative delay means we're behind
+                delay = (record.ts - first_ts) / 1e9 / speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+
+            if record.kind != "public" or record.status != 200:
+                counts["skipped"] += 1
+                continue
+            try:
+                label = self._dispatch(record, counts)
+                if label is not None:
+                    counts["replayed"] += 1
+                    handled[label] += 1
+                else:
+                    counts["skipped"] += 1
+            except Exception as e:
+                counts["errors"] += 1
+                self.logger.warning(f"Replay of {record.path} at {record.ts} failed: {e}")
+
+        self._flush_trades()
+        wall = time.perf_counter() - wall_start
+        recorded = (last_ts - first_ts) / 1e9 if first_ts is not None else 0.0
+        stats = {
+            "records": counts["replayed"] + counts["skipped"] + counts["errors"],
+            "replayed": counts["replayed"],
+            "skipped": counts["skipped"],
+            "errors": counts["errors"],
+            "ticks": counts["ticks"],
+            "orders": self._orders() - orders,
+            "recorded_seconds": recorded,
+            "wall_seconds": wall,
+            "speed": recorded / wall if wall else 0.0,
+            "max_lag_seconds": max_lag,
+            "handled": dict(handled),
+        }
+        self.logger.info(
+            f"Replayed {stats['replayed']} responses ({recorded:.1f}s recorded) in {wall:.2f}s "
+            f"({stats['speed']:.0f}x), {stats['orders']} order(s), max lag {max_lag * 1000:.1f} ms"
+        )
+        return stats
+
+    def _orders(self):
+        """Orders the trader has sent so far (ReplayExchange only)."""
+        return len(getattr(getattr(self.trader, "exchange", None), "orders", ()))
+
+    @staticmethod
+    def _ns(value):
+        if value is None or isinstance(value, int):
+            return value
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1e9)
+
+
+def main():
+    # imported here so ResponseLog/ReplayDriver stay usable without a DB driver installed
+    from data.data_handler import DataHandler
+    from trader.trader import Trader
+    from utils.logger import Logger
+
+    parser = argparse.ArgumentParser(description="Replay a recorded response log through DataHandler and Trader")
+    parser.add_argument("log_path")
+    parser.add_argument("--db-url", default="sqlite:///replay.db", help="scratch DB; replay writes to it")
+    parser.add_argument("--speed", type=float, default=0, help="multiple of the recorded pace, 0 = as fast as possible")
+    parser.add_argument("--symbols", nargs="*", help="symbols fed to the trader (default: all)")
+    parser.add_argument("--load-instruments", action="store_true", help="replay /instruments into the instruments table")
+    args = parser.parse_args()
+
+    log = Logger("replay").get_logger()
+    log.info(f"Response log: {json.dumps(ResponseLog(args.log_path).summary())}")
+
+    data_handler = DataHandler(args.db_url, log)
+    exchange = ReplayExchange(log)
+    driver = ReplayDriver(args.log_path, data_handler, Trader(exchange, log, books={}), log,
+                          symbols=args.symbols, load_instruments=args.load_instruments)
+    stats = driver.run(speed=args.speed or None)
+    log.info(f"Replay stats: {json.dumps(stats)}; {len(exchange.orders)} order(s) acknowledged locally")
+
+
+if __name__ == "__main__":
+    main()
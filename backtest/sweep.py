@@ -0,0 +1,182 @@
+"""Grid-searches strategy parameters across symbols on a process pool"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest.backtester import Backtester, momentum_signals
+from config.settings import SWEEP_MAX_WORKERS, SWEEP_CHUNK_SIZE
+from strategies.moving_average import MovingAverageStrategy
+
+
+def moving_average_signals(close, short_window=10, long_window=30):
+    """MovingAverageStrategy.generate_signals on a bare array (no DataFrame, no mutation)."""
+    return MovingAverageStrategy.generate_signals_batch(close, [(short_window, long_window)])[0]
+
+
+# name -> (signal fn(close, volume, **params), params check, batch fn(close, volume, param_sets) or None)
+STRATEGIES = {
+    "moving_average": (
+        lambda close, volume, **p: moving_average_signals(close, **p),
+        lambda p: p.get("short_window", 10) < p.get("long_window", 30),
+        lambda close, volume, param_sets: MovingAverageStrategy.generate_signals_batch(
+            close, [(p.get("short_window", 10), p.get("long_window", 30)) for p in param_sets]
+        ),
+    ),
+    "momentum": (
+        lambda close, volume, **p: momentum_signals(close, volume, **p),
+        lambda p: True,
+        None,
+    ),
+}
+
+
+# -----------------------
+# Shared price arrays
+# -----------------------
+
+class SharedPrices:
+    """
+    Packs each symbol's close/volume into one shared memory block so workers attach by name
+    instead of receiving a pickled copy per task.
+    """
+
+    def __init__(self, prices):
+        """prices: {symbol: DataFrame with close (+ volume)} or {symbol: {"close": arr, "volume": arr}}"""
+        self.blocks = {}
+        self.meta = {}
+        for symbol, data in prices.items():
+            close = np.ascontiguousarray(data["close"], dtype=np.float64)
+            volume = np.ascontiguousarray(data["volume"], dtype=np.float64) if "volume" in data else np.ones_like(close)
+
+            shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes * 2, 1))
+            packed = np.ndarray((2, len(close)), dtype=np.float64, buffer=shm.buf)
+            packed[0], packed[1] = close, volume
+            self.blocks[symbol] = shm
+            self.meta[symbol] = (shm.name, len(close))
+
+    def close(self):
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+        self.blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# worker-side state, set once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(meta, strategy, backtester):
+    _worker["blocks"] = []
+    _worker["arrays"] = {}
+    for symbol, (name, n) in meta.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker["blocks"].append(shm)  # keep the mapping alive
+        _worker["arrays"][symbol] = np.ndarray((2, n), dtype=np.float64, buffer=shm.buf)
+    _worker["signal_fn"], _, _worker["batch_fn"] = STRATEGIES[strategy]
+    _worker["backtester"] = backtester
+
+
+def _evaluate(symbol, param_sets):
+    """Backtest a chunk of parameter sets on one symbol; returns one stats row per set."""
+    close, volume = _worker["arrays"][symbol]
+    signal_fn, batch_fn = _worker["signal_fn"], _worker["batch_fn"]
+    backtester = _worker["backtester"]
+
+    # one pass over the prices for the whole chunk where the strategy supports it
+    if batch_fn is not None:
+        signal_rows = batch_fn(close, volume, param_sets)
+    else:
+        signal_rows = (signal_fn(close, volume, **params) for params in param_sets)
+
+    rows = []
+    for params, signals in zip(param_sets, signal_rows):
+        stats = backtester.run(close, signals)["stats"]
+        rows.append({"symbol": symbol, **params, **stats})
+    return rows
+
+
+# -----------------------
+# Runner
+# -----------------------
+
+class ParameterSweep:
+    """
+    Evaluates a parameter grid for one strategy across symbols on a process pool.
+    Work is submitted in chunks with a bounded number in flight and workers return only
+    stats rows, so memory stays flat regardless of grid size.
+    """
+
+    def __init__(self, prices, strategy="moving_average", backtester=None,
+                 max_workers=SWEEP_MAX_WORKERS, chunk_size=SWEEP_CHUNK_SIZE, logger=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy}, expected one of {', '.join(STRATEGIES)}")
+        self.prices = prices
+        self.strategy = strategy
+        self.backtester = backtester or Backtester()
+        self.max_workers = max_workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.logger = logger
+
+    def param_sets(self, grid):
+        """Expand {param: [values]} into the valid parameter dicts for this strategy."""
+        keys = list(grid)
+        is_valid = STRATEGIES[self.strategy][1]
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            if is_valid(params):
+                yield params
+
+    def _tasks(self, grid):
+        for symbol in self.prices:
+            params = self.param_sets(grid)
+            while chunk := list(itertools.islice(params, self.chunk_size)):
+                yield symbol, chunk
+
+    def run(self, grid, rank_by="sharpe", ascending=False, top=None):
+        """
+        Run the sweep and return one DataFrame (symbol, params..., stats...) ranked by rank_by.
+        """
+        start = time.perf_counter()
+        rows = []
+
+        with SharedPrices(self.prices) as shared, ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(shared.meta, self.strategy, self.backtester),
+        ) as pool:
+            tasks = self._tasks(grid)
+            pending = set()
+            max_pending = self.max_workers * 2
+
+            for symbol, chunk in tasks:
+                pending.add(pool.submit(_evaluate, symbol, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        rows.extend(future.result())
+            for future in pending:
+                rows.extend(future.result())
+
+        results = pd.DataFrame(rows)
+        if not results.empty:
+            results = results.sort_values(rank_by, ascending=ascending, ignore_index=True)
+            if top:
+                results = results.head(top)
+
+        if self.logger:
+            self.logger.info(
+                f"Sweep {self.strategy}: {len(rows)} run(s) over {len(self.prices)} symbol(s) "
+                f"on {self.max_workers} worker(s) in {time.perf_counter() - start:.2f}s"
+            )
+        return results
@@ -0,0 +1,94 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from data.data_handler import DataHandler, Instrument, Ticker, TradeHistory
+from utils.logger import Logger
+
+
+# Rows/sec of the ORM write path (save_tickers / save_trade_history) vs. the bulk loaders
+# (bulk_save_tickers / bulk_save_trades). COPY is only used on Postgres; pass a scratch DB:
+#   python -m bench.bench_bulk_load --db-url postgresql+psycopg2://user:pw@localhost:5432/bench
+# Only BENCH_* instruments are created and they are removed afterwards.
+
+TICKER = {
+    "last": 111128.5, "lastTime": "2025-09-03T12:57:21.314001Z", "tag": "perpetual", "pair": "XBT:USD",
+    "markPrice": 111226.07501267664, "bid": 111211.5, "bidSize": 622, "ask": 111247.5, "askSize": 622,
+    "vol24h": 3729318, "volumeQuote": 3729318, "openInterest": 7428563.0, "open24h": 108823,
+    "high24h": 111787.5, "low24h": 108754, "lastSize": 213, "fundingRate": 8.4444889e-11,
+    "fundingRatePrediction": 8.0810707e-11, "suspended": False, "indexPrice": 111205.68,
+    "postOnly": False, "change24h": 2.12,
+}
+
+
+def make_trades(n, start):
+    return {"history": [{
+        "time": (start + timedelta(milliseconds=i)).isoformat().replace("+00:00", "Z"),
+        "uid": f"bench-{i}", "price": 111000.0 + (i % 50), "size": 1 + i % 7,
+        "side": "buy" if i % 2 else "sell", "type": "fill",
+    } for i in range(n)]}
+
+
+def setup(handler, symbols):
+    with handler.Session() as session:
+        existing = {s for (s,) in session.query(Instrument.symbol).filter(Instrument.symbol.in_(symbols))}
+        session.add_all(Instrument(symbol=s, tradeable=True) for s in symbols if s not in existing)
+        session.commit()
+    handler.refresh_instrument_cache()
+
+
+def teardown(handler, symbols):
+    with handler.Session() as session:
+        ids = [i for (i,) in session.query(Instrument.id).filter(Instrument.symbol.in_(symbols))]
+        session.query(Ticker).filter(Ticker.instrument_id.in_(ids)).delete(synchronize_session=False)
+        session.query(TradeHistory).filter(TradeHistory.instrument_id.in_(ids)).delete(synchronize_session=False)
+        session.query(Instrument).filter(Instrument.id.in_(ids)).delete(synchronize_session=False)
+        session.commit()
+
+
+def timed(log, label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    log.info(f"{label:<32} {rows:>9} rows  {elapsed:8.3f}s  {rows / elapsed:>12,.0f} rows/s")
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default="sqlite:///bench.db")
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--ticker-polls", type=int, default=50)
+    parser.add_argument("--trades", type=int, default=1000, help="trades per symbol")
+    args = parser.parse_args()
+
+    log = Logger().get_logger()
+    # separate quieter logger so per-call INFO logs stay out of the timing
+    handler_log = Logger("bench-data-handler").get_logger()
+    handler_log.setLevel("WARNING")
+    handler = DataHandler(args.db_url, handler_log)
+    symbols = [f"BENCH_{i}" for i in range(args.symbols)]
+    setup(handler, symbols)
+
+    try:
+        payloads = [{"tickers": [dict(TICKER, symbol=s) for s in symbols]} for _ in range(args.ticker_polls)]
+        n_tickers = args.symbols * args.ticker_polls
+        # save_tickers replaces per call, so time it over every poll like a backfill would
+        orm = timed(log, "save_tickers (ORM)", n_tickers, lambda: [handler.save_tickers(p) for p in payloads])
+        bulk = timed(log, "bulk_save_tickers", n_tickers, lambda: handler.bulk_save_tickers(payloads))
+        log.info(f"tickers: bulk {bulk / orm:.1f}x")
+
+        start = datetime.fromisoformat("2025-09-03T00:00:00+00:00")
+        trades = {s: make_trades(args.trades, start) for s in symbols}
+        n_trades = args.symbols * args.trades
+        orm = timed(log, "save_trade_history (ORM)", n_trades,
+                    lambda: [handler.save_trade_history(s, t) for s, t in trades.items()])
+        teardown(handler, symbols)
+        setup(handler, symbols)
+        bulk = timed(log, "bulk_save_trades", n_trades, lambda: handler.bulk_save_trades(trades))
+        log.info(f"trades: bulk {bulk / orm:.1f}x")
+    finally:
+        teardown(handler, symbols)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import TIMESTAMP
+
+from bench.fake_exchange import FakeKrakenServer
+from bench.fixtures import DEFAULT_FIXTURE, load, ticker_history
+from data.data_handler import DataHandler, Instrument
+from data.refresher import MarketDataRefresher
+from exchange.exchange_wrapper import ExchangeWrapper
+from exchange.rate_limiter import RateLimiter
+from strategies.moving_average import MovingAverageStrategy
+from trader.trader import Trader
+from utils.logger import Logger
+import main as app
+
+
+# Latency of the main write/read/strategy paths, with exchange responses replayed from a fixture
+# (bench/fixtures.py) by a local fake Kraken server (bench/fake_exchange.py). No live API calls.
+# init_instruments overwrites the instruments table, so pass a scratch DB:
+#   python -m bench.bench_suite                                     # SQLite file bench_suite.db
+#   python -m bench.bench_suite --db-url postgresql+psycopg2://user:pw@localhost:5432/bench
+# Every run is appended to bench/results/results.jsonl and compared with the previous run on the
+# same DB dialect and host; --fail-on-regression exits 1 when a median slowed by more than --threshold.
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "results.jsonl")
+OHLCV_KEYS = ["lastTime", "open24h", "high24h", "low24h", "last", "vol24h"]
+
+
+def measure(fn, repeat, warmup=1):
+    """Run fn warmup + repeat times; wall-clock stats of the timed runs in ms."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "median_ms": statistics.median(times),
+        "p90_ms": float(np.percentile(times, 90)),
+        "min_ms": min(times),
+        "mean_ms": statistics.fmean(times),
+    }
+
+
+def git_revision():
+    """Short HEAD sha (+ "-dirty" with uncommitted changes), or None outside a git checkout."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "-uno"], capture_output=True, text=True)
+        return sha.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def init_instruments(handler, fixture):
+    """Load the fixture's instruments (model columns only; the TIMESTAMP ones are left empty)."""
+    columns = {c.name for c in Instrument.__table__.columns if not isinstance(c.type, TIMESTAMP)} - {"id"}
+    handler.init_instruments([
+        {k: v for k, v in inst.items() if k in columns} for inst in fixture["instruments"]["instruments"]
+    ])
+
+
+def cases(handler, exchange, trader, fixture, args, log):
+    """
+    (name, setup, fn) in run order. setup runs once, untimed, before the case; the write cases
+    leave the DB in the state the read cases need.
+    """
+    symbols = list(fixture["order_book"])
+    symbol = symbols[0]
+    refresher = MarketDataRefresher(exchange, handler, log)
+    strategy = MovingAverageStrategy(logger=log)
+    closes = pd.DataFrame({"close": 100 * np.exp(np.cumsum(np.random.default_rng(7).normal(0, 1e-3, args.bars)))})
+    state = {}
+
+    def load_ticker_history():
+        handler.bulk_save_tickers(ticker_history(fixture, args.ticker_history))
+        state["tickers"] = handler.get_tickers_df(symbol, columns=OHLCV_KEYS)
+
+    return [
+        ("save_tickers", None, lambda: handler.save_tickers(fixture["tickers"])),
+        ("save_trade_history", None,
+         lambda: [handler.save_trade_history(s, fixture["history"][s]) for s in symbols]),
+        ("save_order_book", None, lambda: [handler.save_order_book(s, fixture["order_book"][s]) for s in symbols]),
+        ("get_tickers", load_ticker_history, lambda: handler.get_tickers(symbol)),
+        ("trader_momentum", None, lambda: trader.momentum(state["tickers"], symbol)),
+        ("ma_generate_signals", None, lambda: strategy.generate_signals(closes)),
+        ("live_trading_cycle", None, lambda: app.live_trading(handler, exchange, trader, log, refresher)),
+    ]
+
+
+def previous_run(path, dialect, host):
+    """Latest stored run for the same dialect and host, or None."""
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get("dialect") == dialect and run.get("host") == host:
+                last = run
+    return last
+
+
+def compare(current, baseline, threshold):
+    """[(case, baseline median, current median, ratio)] for cases slower than 1 + threshold."""
+    regressions = []
+    for name, stats in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if before and stats["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append((name, before["median_ms"], stats["median_ms"], stats["median_ms"] / before["median_ms"]))
+    return regressions
+
+
+def run(args, log):
+    quiet = Logger("bench-suite-quiet").get_logger()
+    quiet.setLevel("WARNING")  # per-call logs stay out of the timings
+
+    fixture = load(args.fixture, args.symbols)
+    handler = DataHandler(args.db_url, quiet)
+    init_instruments(handler, fixture)
+
+    results = {}
+    with FakeKrakenServer(fixture) as server:
+        # no client-side throttling: the bench measures our code, not the bucket
+        exchange = ExchangeWrapper(quiet, rate_limiter=RateLimiter(quiet, capacity=1e9, refill_rate=1e9))
+        exchange.BASE_URL = server.base_url
+        trader = Trader(exchange, quiet)
+
+        for name, setup, fn in cases(handler, exchange, trader, fixture, args, quiet):
+            if args.only and name not in args.only:
+                continue
+            if setup is not None:
+                setup()
+            results[name] = measure(fn, args.repeat)
+            log.info(f"{name:<22} median {results[name]['median_ms']:9.2f} ms  "
+                     f"p90 {results[name]['p90_ms']:9.2f} ms  min {results[name]['min_ms']:9.2f} ms")
+        exchange.close()
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "dialect": handler.engine.dialect.name,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "fixture": os.path.basename(args.fixture),
+        "symbols": len(fixture["order_book"]),
+        "repeat": args.repeat,
+        "cases": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default="sqlite:///bench_suite.db")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="synthesized on first use if missing")
+    parser.add_argument("--symbols", type=int, default=50, help="symbols when synthesizing the default fixture")
+    parser.add_argument("--ticker-history", type=int, default=500, help="ticker polls stored for the read cases")
+    parser.add_argument("--bars", type=int, default=100000, help="rows for ma_generate_signals")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="case names to run")
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to --results")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown vs. the previous run")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    log = Logger("bench-suite").get_logger()
+    current = run(args, log)
+
+    baseline = previous_run(args.results, current["dialect"], current["host"])
+    regressions = compare(current, baseline, args.threshold) if baseline else []
+    if baseline:
+        log.info(f"Compared with {baseline['revision']} ({baseline['timestamp']})")
+    for name, before, after, ratio in regressions:
+        log.warning(f"Regression {name}: {before:.2f} ms -> {after:.2f} ms ({ratio:.2f}x)")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, "a") as f:
+            f.write(json.dumps(current) + "\n")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class FakeKrakenServer:
+    """
+    Local HTTP server answering the Kraken Futures REST paths ExchangeWrapper builds, from a fixture
+    (bench/fixtures.py). Point a wrapper at it with exchange.BASE_URL = server.base_url.
+    Private (POST) endpoints acknowledge with {"result": "success"}. Keep-alive, like the real API.
+
+        with FakeKrakenServer(fixture) as server:
+            exchange.BASE_URL = server.base_url
+    """
+
+    def __init__(self, fixture, host="127.0.0.1", port=0):
+        self.fixture = fixture
+        self.requests = Counter()  # path -> count
+        self._encoded = {}         # response cache: the server should not be what the bench measures
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def _reply(self, body):
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                server.requests[url.path] += 1
+                self._reply(server.response(url.path, parse_qs(url.query)))
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                path = urlsplit(self.path).path
+                server.requests[path] += 1
+                self._reply(b'{"result":"success","sendStatus":{"status":"placed"}}')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_port}/derivatives"
+        self._thread = None
+
+    def _cached(self, key, body):
+        if key not in self._encoded:
+            self._encoded[key] = json.dumps(body).encode() if body is not None else None
+        return self._encoded[key]
+
+    def response(self, path, query):
+        """Encoded body for a GET path (after /derivatives), or None for 404."""
+        path = path.split("/derivatives", 1)[-1]
+        symbol = query.get("symbol", [None])[0]
+
+        if path == "/instruments":
+            return self._cached(path, self.fixture["instruments"])
+        if path == "/instruments/status":
+            return self._cached(path, self.fixture["instrument_status"])
+        if path == "/tickers":
+            return self._cached(path, self.fixture["tickers"])
+        if path.startswith("/tickers/"):
+            symbol = path.rsplit("/", 1)[1]
+            ticker = next((t for t in self.fixture["tickers"]["tickers"] if t["symbol"] == symbol), None)
+            return self._cached(path, {"result": "success", "ticker": ticker} if ticker else None)
+        if path == "/orderbook":
+            return self._cached((path, symbol), self.fixture["order_book"].get(symbol))
+        if path == "/history":
+            if "lastTime" in query:
+                # older pages: the recording only holds the newest one
+                return self._cached((path, "older"), {"result": "success", "history": []})
+            return self._cached((path, symbol), self.fixture["history"].get(symbol))
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-kraken", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from bench.bench_bulk_load import TICKER
+
+
+# Recorded (or synthesized) exchange responses replayed by bench/fake_exchange.py.
+# One JSON file per fixture set:
+#   {"instruments": ..., "instrument_status": ..., "tickers": ...,
+#    "order_book": {symbol: ...}, "history": {symbol: ...}}
+# each value being the raw response body of the matching ExchangeWrapper call.
+#   python -m bench.fixtures --record --symbols 20       # from the live API (public endpoints only)
+#   python -m bench.fixtures --synthesize --symbols 50   # offline, deterministic
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+DEFAULT_FIXTURE = os.path.join(FIXTURE_DIR, "default.json")
+
+
+def _iso(ts):
+    return ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def record(exchange, path=DEFAULT_FIXTURE, symbols=20):
+    """Save live public responses for the first `symbols` tradeable instruments."""
+    instruments = exchange.get_instruments()
+    tradeable = [i["symbol"] for i in instruments["instruments"] if i.get("tradeable")][:symbols]
+    fixture = {
+        "instruments": instruments,
+        "instrument_status": exchange.get_instrument_status_list(),
+        "tickers": exchange.get_ticker_list(),
+        "order_book": {s: exchange.get_order_book(s) for s in tradeable},
+        "history": {s: exchange.get_trade_history(s) for s in tradeable},
+    }
+    save(fixture, path)
+    return fixture
+
+
+def synthesize(symbols=50, levels=50, trades=100, seed=7, now=None):
+    """Responses shaped like the Kraken Futures ones (see dump.json), from a fixed seed."""
+    rng = random.Random(seed)
+    now = now or datetime(2025, 9, 3, 12, 58, tzinfo=timezone.utc)
+    names = [f"PF_BENCH{i:03d}USD" for i in range(symbols)]
+
+    instruments, statuses, tickers, books, history = [], [], [], {}, {}
+    for symbol in names:
+        price = rng.uniform(0.5, 100000)
+        tick = round(price / 10000, 6) or 0.000001
+
+        instruments.append({
+            "symbol": symbol, "type": "flexible_futures", "underlying": None, "tradeable": True,
+            "tickSize": tick, "contractSize": 1, "impactMidSize": 1, "maxPositionSize": 1000000,
+            "fundingRateCoefficient": 8, "maxRelativeFundingRate": 0.001, "contractValueTradePrecision": 4,
+            "postOnly": False, "base": symbol[3:-3], "quote": "USD", "pair": f"{symbol[3:-3]}:USD",
+            "category": "Layer 1", "tags": [], "tradfi": False,
+            "marginLevels": [{"numNonContractUnits": 0, "initialMargin": 0.02, "maintenanceMargin": 0.01}],
+        })
+        statuses.append({
+            "tradeable": symbol, "experiencingDislocation": False, "priceDislocationDirection": None,
+            "experiencingExtremeVolatility": rng.random() < 0.05, "extremeVolatilityInitialMarginMultiplier": 1,
+        })
+        tickers.append(dict(
+            TICKER, symbol=symbol, pair=f"{symbol[3:-3]}:USD", last=price, markPrice=price,
+            bid=price - tick, ask=price + tick, indexPrice=price, lastTime=_iso(now - timedelta(seconds=rng.random() * 60)),
+        ))
+        books[symbol] = {"result": "success", "serverTime": _iso(now), "orderBook": {
+            "bids": [[price - tick * (i + 1), rng.randint(1, 5000)] for i in range(levels)],
+            "asks": [[price + tick * (i + 1), rng.randint(1, 5000)] for i in range(levels)],
+        }}
+        history[symbol] = {"result": "success", "serverTime": _iso(now), "history": [{
+            "time": _iso(now - timedelta(milliseconds=250 * i)), "trade_id": trades - i,
+            "price": price + tick * rng.randint(-20, 20), "size": rng.randint(1, 500),
+            "side": rng.choice(("buy", "sell")), "type": "fill", "uid": f"{symbol}-{trades - i}",
+        } for i in range(trades)]}
+
+    server_time = _iso(now)
+    return {
+        "instruments": {"result": "success", "serverTime": server_time, "instruments": instruments},
+        "instrument_status": {"result": "success", "serverTime": server_time, "instrumentStatus": statuses},
+        "tickers": {"result": "success", "serverTime": server_time, "tickers": tickers},
+        "order_book": books,
+        "history": history,
+    }
+
+
+def ticker_history(fixture, polls, seed=7, interval=timedelta(minutes=1)):
+    """
+    `polls` get_ticker_list payloads built from the fixture's tickers: lastTime one interval
+    apart (oldest first) and last/markPrice on a small random walk, for ticker-history reads.
+    """
+    rng = random.Random(seed)
+    base = fixture["tickers"]["tickers"]
+    start = datetime(2025, 9, 3, tzinfo=timezone.utc) - polls * interval
+    prices = {t["symbol"]: float(t.get("last") or 1.0) for t in base}
+
+    payloads = []
+    for i in range(polls):
+        ts = _iso(start + i * interval)
+        tickers = []
+        for t in base:
+            prices[t["symbol"]] *= 1 + rng.gauss(0, 0.002)
+            tickers.append(dict(t, last=prices[t["symbol"]], markPrice=prices[t["symbol"]], lastTime=ts,
+                                vol24h=(t.get("vol24h") or 0) + i))
+        payloads.append({"result": "success", "tickers": tickers})
+    return payloads
+
+
+def save(fixture, path=DEFAULT_FIXTURE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fixture, f)
+
+
+def load(path=DEFAULT_FIXTURE, symbols=50):
+    """Load a fixture set, synthesizing (and saving) the default one on first use."""
+    if not os.path.exists(path):
+        if path != DEFAULT_FIXTURE:
+            raise FileNotFoundError(f"No fixture at {path} (record one with python -m bench.fixtures --record)")
+        save(synthesize(symbols), path)
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", action="store_true", help="save live public API responses")
+    mode.add_argument("--synthesize", action="store_true", help="write a deterministic offline fixture")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--path", default=DEFAULT_FIXTURE)
+    args = parser.parse_args()
+
+    if args.record:
+        from exchange.exchange_wrapper import ExchangeWrapper
+        from utils.logger import Logger
+        fixture = record(ExchangeWrapper(Logger().get_logger()), args.path, args.symbols)
+    else:
+        fixture = synthesize(args.symbols)
+        save(fixture, args.path)
+    print(f"Wrote {len(fixture['order_book'])} symbol(s) to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
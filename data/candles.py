@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from data.data_handler import timeframe_delta
+from config.settings import CANDLE_TIMEFRAMES, EXCHANGE
+
+
+class CandleAggregator:
+    """
+    Builds OHLCV bars from trade_history into the ohlcv table.
+
+    DataHandler records the earliest trade time it writes per symbol; update() drains that and
+    rebuilds only the bars from there on. The base (smallest) timeframe is aggregated from trades,
+    the larger ones are rolled up from the stored base bars, so a cycle reads the last few minutes
+    of trades plus at most one larger bar's worth of base bars. Rebuilds are idempotent upserts,
+    so late or backfilled trades simply correct the bars they land in.
+    """
+
+    def __init__(self, data_handler, logger, timeframes=CANDLE_TIMEFRAMES, exchange=EXCHANGE):
+        self.data_handler = data_handler
+        self.logger = logger
+        self.exchange = exchange
+        self.timeframes = sorted(timeframes, key=timeframe_delta)
+        self.base = self.timeframes[0]
+
+        base_delta = timeframe_delta(self.base)
+        for tf in self.timeframes[1:]:
+            if timeframe_delta(tf) % base_delta:
+                raise ValueError(f"Timeframe {tf} is not a multiple of {self.base}")
+
+        self.logger.info(f"Initialized CandleAggregator ({', '.join(self.timeframes)})")
+
+    def _rows(self, symbol, timeframe, bars):
+        return [
+            {
+                "exchange": self.exchange, "symbol": symbol, "timeframe": timeframe,
+                "timestamp": ts.to_pydatetime(), "open": float(bar.open), "high": float(bar.high),
+                "low": float(bar.low), "close": float(bar.close), "volume": float(bar.volume),
+            }
+            for ts, bar in bars.iterrows()
+        ]
+
+    def rebuild(self, symbol, start, end=None):
+        """Recompute every timeframe's bars for symbol from start (floored to each bar) to end."""
+        written = 0
+
+        # base bars straight from trades
+        base_start = pd.Timestamp(start).floor(timeframe_delta(self.base))
+        trades = self.data_handler.get_trades_df(symbol, ["timestamp", "price", "size"], base_start, end)
+        if trades.empty:
+            return 0
+        trades = trades.set_index("timestamp")
+        bars = trades["price"].resample(timeframe_delta(self.base)).ohlc()
+        bars["volume"] = trades["size"].resample(timeframe_delta(self.base)).sum()
+        bars = bars.dropna(subset=["open"])  # no trades -> no bar
+        written += self.data_handler.upsert_ohlcv(self._rows(symbol, self.base, bars)) or 0
+
+        # larger timeframes rolled up from the stored base bars
+        for tf in self.timeframes[1:]:
+            tf_start = pd.Timestamp(start).floor(timeframe_delta(tf))
+            base = self.data_handler.get_ohlcv_df(symbol, self.base, tf_start, end, self.exchange)
+            if base.empty:
+                continue
+            base = base.set_index("timestamp").resample(timeframe_delta(tf))
+            bars = pd.DataFrame({
+                "open": base["open"].first(), "high": base["high"].max(), "low": base["low"].min(),
+                "close": base["close"].last(), "volume": base["volume"].sum(),
+            }).dropna(subset=["open"])
+            written += self.data_handler.upsert_ohlcv(self._rows(symbol, tf, bars)) or 0
+
+        return written
+
+    def update(self):
+        """Rebuild bars for every symbol that had trades written since the last call. Returns bars written."""
+        start = time.perf_counter()
+        updates = self.data_handler.drain_trade_updates()
+
+        written = 0
+        for symbol, earliest in updates.items():
+            try:
+                written += self.backfill(symbol, earliest)
+            except Exception as e:
+                self.logger.warning(f"Failed to update candles for {symbol}: {e}")
+
+        if updates:
+            self.logger.info(
+                f"Updated {written} candle(s) for {len(updates)} symbol(s) in {time.perf_counter() - start:.3f}s"
+            )
+        return written
+
+    def backfill(self, symbol, start, end=None, chunk=timedelta(days=1)):
+        """Build bars for a historical range in chunks (e.g. after bulk_save_trades or on first run)."""
+        stop = end or datetime.utcnow()
+        written = 0
+        lower = start
+        while True:
+            upper = lower + chunk
+            if upper >= stop:
+                written += self.rebuild(symbol, lower, end)  # open-ended: includes the bar in progress
+                break
+            written += self.rebuild(symbol, lower, upper)
+            lower = upper
+        self.logger.debug(f"Built {written} candle(s) for {symbol} from {start}")
+        return written
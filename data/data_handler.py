@@ -1,11 +1,20 @@
 from sqlalchemy import (
     create_engine, Column, Integer, BigInteger, String, Numeric, 
-    TIMESTAMP, ForeignKey, JSON, UniqueConstraint, Enum, Boolean, Float
+    TIMESTAMP, ForeignKey, JSON, UniqueConstraint, Index, Enum, Boolean, Float
 )
+from sqlalchemy import func, select, cast, inspect, text, bindparam
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from datetime import datetime, timezone
+import threading
+import csv
+import io
+import json
 import pandas as pd
+from config.settings import EXCHANGE, TRADE_UID_MIGRATE_BATCH, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from utils.metrics import METRICS
 
 # -------------------------------
 #           Schema def
@@ -13,6 +22,9 @@ import pandas as pd
 
 Base = declarative_base()
 
+# order book levels ([[price, size], ...]): float8[][] on Postgres, JSON elsewhere (SQLite stand-in)
+BookLevels = JSON().with_variant(postgresql.ARRAY(postgresql.DOUBLE_PRECISION, dimensions=2), "postgresql")
+
 
 class Indices(Base):
     __tablename__ = "indices"
@@ -37,16 +49,16 @@ class Instrument(Base):
     underlying = Column(String)                  # link to index symbol
     index_id = Column(Integer, ForeignKey("indices.id", ondelete="CASCADE"), nullable=True)
     tradeable = Column(Boolean)
-    tickSize = Column(Numeric)
-    contractSize = Column(Numeric)
-    impactMidSize = Column(Numeric)
-    maxPositionSize = Column(Numeric)
+    tickSize = Column(Float)
+    contractSize = Column(Float)
+    impactMidSize = Column(Float)
+    maxPositionSize = Column(Float)
     openingDate = Column(TIMESTAMP, nullable=True)
-    fundingRateCoefficient = Column(Numeric)
-    maxRelativeFundingRate = Column(Numeric)
+    fundingRateCoefficient = Column(Float)
+    maxRelativeFundingRate = Column(Float)
     isin = Column(String)
     lastTradingTime = Column(TIMESTAMP, nullable=True)
-    contractValueTradePrecision = Column(Numeric)
+    contractValueTradePrecision = Column(Integer)   # decimal places for order size
     postOnly = Column(Boolean)
     feeScheduleUid = Column(String)
     mtf = Column(Boolean)
@@ -94,31 +106,42 @@ class TradeHistory(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
-    timestamp = Column(TIMESTAMP, nullable=False, index=True, default=datetime.utcnow)
-    price = Column(Numeric, nullable=False)
-    size = Column(Numeric, nullable=False)
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    price = Column(Float, nullable=False)   # float8: no Decimal on read
+    size = Column(Float, nullable=False)
     side = Column(String, nullable=False)   # buy/sell
     type = Column(String, nullable=True)    # fill, etc.
+    uid = Column(String, nullable=False)    # exchange trade uid; dedup key for append mode
 
     instrument = relationship("Instrument", back_populates="trades")
 
+    __table_args__ = (
+        # timestamp is part of the key so it also holds on the range-partitioned table (data/maintenance.py)
+        UniqueConstraint("instrument_id", "uid", "timestamp", name="uq_trade_history_instrument_uid_ts"),
+        Index("ix_trade_history_instrument_ts", "instrument_id", "timestamp"),
+    )
+
 class OrderBook(Base):
     __tablename__ = "order_books"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
-    timestamp = Column(TIMESTAMP, nullable=False, index=True, default=datetime.utcnow)
-    bids = Column(JSON, nullable=False)   # save list of [price, size]
-    asks = Column(JSON, nullable=False)   # save list of [price, size]
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    bids = Column(BookLevels, nullable=False)   # save list of [price, size]
+    asks = Column(BookLevels, nullable=False)   # save list of [price, size]
 
     instrument = relationship("Instrument", back_populates="order_books")
 
+    __table_args__ = (
+        Index("ix_order_books_instrument_ts", "instrument_id", "timestamp"),
+    )
+
 class Ticker(Base):
     __tablename__ = "tickers"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
-    timestamp = Column(TIMESTAMP, nullable=False, index=True, default=datetime.utcnow)
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
 
     # price info
     last = Column(Float, nullable=True)
@@ -150,17 +173,356 @@ class Ticker(Base):
 
     instrument = relationship("Instrument", back_populates="tickers")
 
+    __table_args__ = (
+        Index("ix_tickers_instrument_ts", "instrument_id", "timestamp"),
+    )
+
+class LatestTicker(Base):
+    """Newest ticker per instrument, upserted only when a field changed (snapshot_tickers)."""
+    __tablename__ = "latest_tickers"
+
+    instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), primary_key=True)
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)   # last change
+
+    last = Column(Float, nullable=True)
+    lastTime = Column(TIMESTAMP, nullable=True)
+    markPrice = Column(Float, nullable=True)
+    bid = Column(Float, nullable=True)
+    bidSize = Column(Float, nullable=True)
+    ask = Column(Float, nullable=True)
+    askSize = Column(Float, nullable=True)
+    open24h = Column(Float, nullable=True)
+    high24h = Column(Float, nullable=True)
+    low24h = Column(Float, nullable=True)
+    lastSize = Column(Float, nullable=True)
+    indexPrice = Column(Float, nullable=True)
+    vol24h = Column(Float, nullable=True)
+    volumeQuote = Column(Float, nullable=True)
+    openInterest = Column(Float, nullable=True)
+    fundingRate = Column(Float, nullable=True)
+    fundingRatePrediction = Column(Float, nullable=True)
+    change24h = Column(Float, nullable=True)
+    suspended = Column(Boolean, nullable=True)
+    postOnly = Column(Boolean, nullable=True)
+    tag = Column(String, nullable=True)
+    pair = Column(String, nullable=True)
+
+class LatestInstrumentStatus(Base):
+    """Newest status per instrument, upserted only when a field changed (snapshot_instrument_status)."""
+    __tablename__ = "latest_instrument_status"
+
+    instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), primary_key=True)
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)   # last change
+    experiencingDislocation = Column(Boolean)
+    priceDislocationDirection = Column(String)
+    experiencingExtremeVolatility = Column(Boolean)
+    extremeVolatilityInitialMarginMultiplier = Column(Integer)
+
+class SnapshotChange(Base):
+    """Change log for the latest_* tables: only the fields that changed, per instrument and poll."""
+    __tablename__ = "snapshot_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    instrument_id = Column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
+    timestamp = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    source = Column(String, nullable=False)     # ticker | status
+    changes = Column(JSON, nullable=False)      # {field: new value}
+
+    __table_args__ = (
+        Index("ix_snapshot_changes_instrument_ts", "instrument_id", "timestamp"),
+    )
+
+class OHLCV(Base):
+    """Candles aggregated from trade_history (data/candles.py); layout as in overview.md."""
+    __tablename__ = "ohlcv"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exchange = Column(String, nullable=False)       # e.g. krakenfutures
+    symbol = Column(String, nullable=False)         # e.g. PI_XBTUSD
+    timeframe = Column(String, nullable=False)      # e.g. 1m, 5m, 1h
+    timestamp = Column(TIMESTAMP, nullable=False)   # bar open (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("exchange", "symbol", "timeframe", "timestamp", name="uq_ohlcv_bar"),
+    )
+
+
+
+# dedup key for trade inserts (ON CONFLICT target)
+TRADE_KEY = ["instrument_id", "uid", "timestamp"]
+
+# ticker payload fields written by the bulk loader (same set save_tickers maps)
+TICKER_FIELDS = [
+    "last", "lastTime", "tag", "pair", "markPrice", "bid", "bidSize", "ask", "askSize",
+    "vol24h", "volumeQuote", "openInterest", "open24h", "high24h", "low24h", "lastSize",
+    "fundingRate", "fundingRatePrediction", "suspended", "indexPrice", "postOnly", "change24h",
+]
+
+# instrument status payload fields (save_instrument_status / snapshot_instrument_status)
+STATUS_FIELDS = [
+    "experiencingDislocation", "priceDislocationDirection", "experiencingExtremeVolatility",
+    "extremeVolatilityInitialMarginMultiplier",
+]
+
+# snapshot source -> (latest_* table, payload fields)
+SNAPSHOTS = {
+    "ticker": (LatestTicker.__table__, TICKER_FIELDS),
+    "status": (LatestInstrumentStatus.__table__, STATUS_FIELDS),
+}
+
+
+def timeframe_delta(timeframe):
+    """Candle timeframe ("1m", "5m", "1h", "1d") -> pd.Timedelta."""
+    units = {"m": "min", "h": "h", "d": "D"}
+    return pd.Timedelta(int(timeframe[:-1]), unit=units[timeframe[-1]])
 
 
 class DataHandler:
     def __init__(self, db_url, logger):
-        self.engine = create_engine(db_url, echo=False)
+        self.engine = create_engine(db_url, echo=False, **self._pool_args(db_url))
         Base.metadata.create_all(self.engine)  # Creates tables if not exist
         self.Session = sessionmaker(bind=self.engine)
 
+        # per-symbol newest stored trade time (append_trade_history)
+        self._trade_hwm = {}
+
+        # per-symbol earliest trade time written since the last drain_trade_updates() (candle aggregation)
+        self._trade_updates = {}
+        self._trade_updates_lock = threading.Lock()
+
         self.logger = logger
+
+        # source -> {instrument_id: {field: value}}: last written state of the latest_* tables (snapshot mode)
+        self._snapshots = {}
+        self._snapshots_lock = threading.Lock()
+
+        # symbol -> {"id", ...metadata}; write paths resolve instrument ids from here, not the DB
+        self._instruments = {}
+        self.refresh_instrument_cache()
+
+        # trade_history tables from before the uid dedup key get it here; append_trade_history needs it
+        self.trade_uid_ready = self.migrate_trade_uid()
+
+        # order_books created before float8[][] levels keep JSON binds until compact_types() converts them
+        self.book_levels_ready = self.check_book_levels()
+
         self.logger.info(f"Initialized DataHandler to DB: {db_url}")
 
+    @staticmethod
+    def _pool_args(db_url):
+        """QueuePool sizing from settings (refresher workers + headroom). SQLite keeps its own pool."""
+        if make_url(db_url).get_backend_name() == "sqlite":
+            return {}
+        return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+
+    def refresh_instrument_cache(self):
+        """(Re)load the symbol -> instrument id/metadata cache. Called on init and by init_instruments."""
+        with self.Session() as session:
+            rows = session.query(
+                Instrument.symbol, Instrument.id, Instrument.type, Instrument.tradeable,
+                Instrument.tickSize, Instrument.contractSize,
+            ).all()
+
+        # swap in a new dict so readers on other threads never see a half-built cache
+        self._instruments = {
+            r.symbol: {
+                "id": r.id,
+                "type": r.type,
+                "tradeable": r.tradeable,
+                "tickSize": float(r.tickSize) if r.tickSize is not None else None,
+                "contractSize": float(r.contractSize) if r.contractSize is not None else None,
+            }
+            for r in rows
+        }
+        self.logger.info(f"Cached {len(self._instruments)} instruments")
+
+    def get_instrument_id(self, symbol):
+        inst = self._instruments.get(symbol)
+        return inst["id"] if inst else None
+
+    def get_instrument_meta(self, symbol):
+        return self._instruments.get(symbol)
+
+    def _symbol_id_map(self, symbols):
+        """{symbol: instrument_id} for the known symbols, from the cache."""
+        cache = self._instruments
+        return {s: cache[s]["id"] for s in set(symbols) if s in cache}
+
+    def _insert(self, table):
+        """Dialect insert so ON CONFLICT is available (Postgres, SQLite stand-in)."""
+        if self.engine.dialect.name == "sqlite":
+            return sqlite.insert(table)
+        return postgresql.insert(table)
+
+    def _is_pg_array(self, column):
+        if column.table.name == OrderBook.__tablename__ and not self.book_levels_ready:
+            return False  # legacy json bids/asks
+        return isinstance(column.type.dialect_impl(self.engine.dialect), postgresql.ARRAY)
+
+    def _book_levels(self, levels):
+        """Bind value for an order_books bids/asks column (JSON while the legacy json columns remain)."""
+        if self.book_levels_ready:
+            return levels
+        return bindparam(None, levels, type_=JSON, unique=True)
+
+    @staticmethod
+    def _parse_time(time_str):
+        return datetime.fromisoformat(time_str.replace("Z", "+00:00"))
+
+    def _mark_trades_written(self, symbol, timestamps):
+        """Remember the earliest trade time written for symbol so candles can be rebuilt from there."""
+        earliest = min(timestamps, default=None)
+        if earliest is None:
+            return
+        if earliest.tzinfo is not None:
+            earliest = earliest.astimezone(timezone.utc).replace(tzinfo=None)
+        with self._trade_updates_lock:
+            current = self._trade_updates.get(symbol)
+            if current is None or earliest < current:
+                self._trade_updates[symbol] = earliest
+
+    def drain_trade_updates(self):
+        """{symbol: earliest trade time written} since the last call."""
+        with self._trade_updates_lock:
+            updates, self._trade_updates = self._trade_updates, {}
+        return updates
+
+    @staticmethod
+    def _trade_uid(trade):
+        """Exchange uid, or a deterministic key if the payload has none."""
+        return trade.get("uid") or f"{trade['time']}|{trade['price']}|{trade['size']}|{trade['side']}"
+
+    # -------------------------------
+    #   Schema migration
+    # -------------------------------
+
+    def _has_trade_key(self, inspector):
+        """True if trade_history has the (instrument_id, uid, timestamp) unique constraint or index."""
+        key = set(TRADE_KEY)
+        uniques = [u["column_names"] for u in inspector.get_unique_constraints("trade_history")]
+        uniques += [i["column_names"] for i in inspector.get_indexes("trade_history") if i.get("unique")]
+        return any(set(cols) == key for cols in uniques)
+
+    def check_book_levels(self):
+        """
+        True if order_books bids/asks are float8[][] (or the DB isn't Postgres). A table from before
+        the compact layout still has json columns: writes then bind JSON, and compact_types() converts
+        the table (and flips this flag) in a maintenance window.
+        """
+        if self.engine.dialect.name != "postgresql":
+            return True
+        columns = {c["name"]: c["type"] for c in inspect(self.engine).get_columns(OrderBook.__tablename__)}
+        legacy = [side for side in ("bids", "asks") if not isinstance(columns.get(side), postgresql.ARRAY)]
+        if legacy:
+            self.logger.warning(
+                f"order_books {'/'.join(legacy)} are json, not float8[][]: writing JSON until "
+                f"TimeSeriesMaintenance.compact_types() has run"
+            )
+        return not legacy
+
+    @staticmethod
+    def _stored_trade(row):
+        """Payload-shaped trade from a stored row, so _trade_uid gives the key the live path would."""
+        ts = row.timestamp
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+        def number(value):
+            value = float(value)
+            return int(value) if value.is_integer() else value  # integral sizes arrive as JSON ints
+
+        return {
+            "time": ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "price": number(row.price),
+            "size": number(row.size),
+            "side": row.side,
+        }
+
+    def migrate_trade_uid(self, batch=TRADE_UID_MIGRATE_BATCH):
+        """
+        Bring a trade_history created before the uid dedup key up to date (create_all doesn't alter
+        existing tables): add uid, backfill it with the _trade_uid fallback key built from the stored
+        time/price/size/side, make it NOT NULL (Postgres), drop rows that collide on the new key and add
+        the (instrument_id, uid, timestamp) unique key. Idempotent: an up-to-date table costs one
+        inspection. Returns True when the table has the key, False if the migration failed.
+        """
+        try:
+            inspector = inspect(self.engine)
+            columns = {c["name"]: c for c in inspector.get_columns("trade_history")}
+            is_postgres = self.engine.dialect.name == "postgresql"
+            if "uid" in columns and self._has_trade_key(inspector) and not (is_postgres and columns["uid"]["nullable"]):
+                return True
+
+            self.logger.info("Migrating trade_history to the (instrument_id, uid, timestamp) dedup key")
+            with self.engine.begin() as conn:
+                if "uid" not in columns:
+                    conn.execute(text("ALTER TABLE trade_history ADD COLUMN uid VARCHAR"))
+
+            # keyset batches over id, one transaction each
+            table = TradeHistory.__table__
+            pending = (
+                select(table.c.id, table.c.timestamp, table.c.price, table.c.size, table.c.side)
+                .where(table.c.uid.is_(None), table.c.id > bindparam("after"))
+                .order_by(table.c.id).limit(batch)
+            )
+            match = [table.c.id == bindparam("row_id")]
+            if is_postgres:
+                match.append(table.c.timestamp == bindparam("row_ts"))  # prunes partitions
+            fill = table.update().where(*match).values(uid=bindparam("row_uid"))
+
+            filled, after = 0, 0
+            while True:
+                with self.engine.begin() as conn:
+                    rows = conn.execute(pending, {"after": after}).all()
+                    if not rows:
+                        break
+                    conn.execute(fill, [
+                        {"row_uid": self._trade_uid(self._stored_trade(r)), "row_id": r.id, "row_ts": r.timestamp}
+                        for r in rows
+                    ])
+                filled += len(rows)
+                after = rows[-1].id
+
+            with self.engine.begin() as conn:
+                if is_postgres:
+                    conn.execute(text("ALTER TABLE trade_history ALTER COLUMN uid SET NOT NULL"))
+                # SQLite can't add NOT NULL or constraints to an existing table; a unique index serves ON CONFLICT
+                if not self._has_trade_key(inspect(conn)):
+                    dropped = conn.execute(text(
+                        'DELETE FROM trade_history WHERE id NOT IN (SELECT min(id) FROM trade_history '
+                        'GROUP BY instrument_id, uid, "timestamp")'
+                    )).rowcount
+                    if is_postgres:
+                        conn.execute(text(
+                            "ALTER TABLE trade_history ADD CONSTRAINT uq_trade_history_instrument_uid_ts "
+                            'UNIQUE (instrument_id, uid, "timestamp")'
+                        ))
+                    else:
+                        conn.execute(text(
+                            "CREATE UNIQUE INDEX IF NOT EXISTS uq_trade_history_instrument_uid_ts "
+                            'ON trade_history (instrument_id, uid, "timestamp")'
+                        ))
+                    self.logger.info(f"Added trade dedup key ({dropped} duplicate row(s) removed)")
+
+            self.logger.info(f"Migrated trade_history: backfilled uid on {filled} row(s)")
+            return True
+
+        except SQLAlchemyError as e:
+            self.logger.error(f"Failed to migrate trade_history uid key: {e}")
+            return False
+
+
+    def _reset_instrument_state(self):
+        """Instrument ids changed: drop everything keyed on the old ones and reload the cache."""
+        self._trade_hwm.clear()
+        with self._snapshots_lock:
+            self._snapshots.clear()
+        self.refresh_instrument_cache()
 
     def init_instruments(self, instrument_list: list):
         """
@@ -172,6 +534,9 @@ class DataHandler:
                 # Delete all existing instruments and indices
                 session.query(Instrument).delete()
                 session.query(Indices).delete()
+                # snapshot rows are keyed on the old ids (Postgres cascades these, SQLite doesn't)
+                session.query(LatestTicker).delete()
+                session.query(LatestInstrumentStatus).delete()
                 session.commit()
                 self.logger.info("Cleared existing instruments and indices")
 
@@ -191,11 +556,15 @@ class DataHandler:
 
                 session.commit()
                 self.logger.info(f"Inserted {len(instrument_list)} instruments successfully")
-                return "success"
+
+            self._reset_instrument_state()
+            return "success"
 
         except SQLAlchemyError as e:
             session.rollback()
             self.logger.error(f"Failed to add instruments: {e}")
+            # the delete above may already be committed
+            self._reset_instrument_state()
             return "fail"
         
     def save_instrument_status(self, status_data: dict):
@@ -211,9 +580,7 @@ class DataHandler:
                     raw_statuses = [status_data]
 
                 # Collect all instrument IDs and generate map
-                instrument_symbols = [s.get("tradeable") for s in raw_statuses if s.get("tradeable")]
-                instruments = session.query(Instrument).filter(Instrument.symbol.in_(instrument_symbols)).all()
-                instrument_map = {inst.symbol: inst.id for inst in instruments}
+                instrument_map = self._symbol_id_map(s.get("tradeable") for s in raw_statuses if s.get("tradeable"))
 
                 if not instrument_map:
                     self.logger.warning("No matching instruments found for provided statuses")
@@ -273,9 +640,7 @@ class DataHandler:
                     return False
 
                 # Map symbols to instrument IDs
-                symbols = [t["symbol"] for t in tickers if t.get("symbol")]
-                instruments = session.query(Instrument).filter(Instrument.symbol.in_(symbols)).all()
-                instrument_map = {inst.symbol: inst.id for inst in instruments}
+                instrument_map = self._symbol_id_map(t["symbol"] for t in tickers if t.get("symbol"))
 
                 if not instrument_map:
                     self.logger.warning("No matching instruments found for provided tickers")
@@ -341,31 +706,34 @@ class DataHandler:
         with self.Session() as session:
             try:
                 # Find instrument id
-                instrument = session.query(Instrument).filter_by(symbol=symbol).first()
-                if not instrument:
+                instrument_id = self.get_instrument_id(symbol)
+                if not instrument_id:
                     self.logger.warning(f"No instrument found for symbol {symbol}")
                     return False
 
                 # Delete old trade history for this instrument if it exists
-                session.query(TradeHistory).filter_by(instrument_id=instrument.id).delete()
+                session.query(TradeHistory).filter_by(instrument_id=instrument_id).delete()
+                self._trade_hwm.pop(symbol, None)
                 self.logger.info(f"Cleared old trade history for {symbol}")
 
                 # Prepare new trade entries
                 trades_to_add = []
                 for trade in trade_data.get("history", []):
                     trade_entry = TradeHistory(
-                        instrument_id=instrument.id,
+                        instrument_id=instrument_id,
                         timestamp=datetime.fromisoformat(trade["time"].replace("Z", "+00:00")),
                         price=trade["price"],
                         size=trade["size"],
                         side=trade["side"],
                         type=trade["type"],
+                        uid=self._trade_uid(trade),
                     )
                     trades_to_add.append(trade_entry)
 
                 # Bulk insert
                 session.bulk_save_objects(trades_to_add)
                 session.commit()
+                self._mark_trades_written(symbol, (t.timestamp for t in trades_to_add))
 
                 self.logger.info(f"Inserted {len(trades_to_add)} trades for {symbol}")
                 return True
@@ -376,18 +744,84 @@ class DataHandler:
                 return False
 
 
+    def get_trade_high_water_mark(self, symbol: str):
+        """Newest stored trade time for a symbol (tz-aware UTC), or None if there are no trades."""
+        if symbol in self._trade_hwm:
+            return self._trade_hwm[symbol]
+
+        with self.Session() as session:
+            hwm = (
+                session.query(func.max(TradeHistory.timestamp))
+                .filter(TradeHistory.instrument_id == self.get_instrument_id(symbol))
+                .scalar()
+            )
+        if hwm is not None and hwm.tzinfo is None:
+            hwm = hwm.replace(tzinfo=timezone.utc)
+
+        self._trade_hwm[symbol] = hwm
+        return hwm
+
+    def append_trade_history(self, symbol: str, trade_data: dict):
+        """
+        Incremental counterpart of save_trade_history: keeps history, inserts only trades newer
+        than the symbol's high-water mark, and lets the (instrument_id, uid, timestamp) key drop overlaps
+        (ON CONFLICT DO NOTHING). Returns the number of trades sent to the DB, or None on failure.
+        """
+        hwm = self.get_trade_high_water_mark(symbol)
+
+        with self.Session() as session:
+            try:
+                instrument_id = self.get_instrument_id(symbol)
+                if not instrument_id:
+                    self.logger.warning(f"No instrument found for symbol {symbol}")
+                    return None
+
+                rows = []
+                newest = hwm
+                for trade in trade_data.get("history", []):
+                    ts = self._parse_time(trade["time"])
+                    # trades at exactly the hwm may be new fills in the same ms; the uid key dedups those
+                    if hwm is not None and ts < hwm:
+                        continue
+                    rows.append({
+                        "instrument_id": instrument_id,
+                        "timestamp": ts,
+                        "price": trade["price"],
+                        "size": trade["size"],
+                        "side": trade["side"],
+                        "type": trade.get("type"),
+                        "uid": self._trade_uid(trade),
+                    })
+                    if newest is None or ts > newest:
+                        newest = ts
+
+                if rows:
+                    stmt = self._insert(TradeHistory.__table__).on_conflict_do_nothing(index_elements=TRADE_KEY)
+                    session.execute(stmt, rows)
+                    session.commit()
+                    self._mark_trades_written(symbol, (r["timestamp"] for r in rows))
+
+                self._trade_hwm[symbol] = newest
+                self.logger.info(f"Appended up to {len(rows)} new trades for {symbol}")
+                return len(rows)
+
+            except SQLAlchemyError as e:
+                session.rollback()
+                self.logger.error(f"Failed to append trade history for {symbol}: {e}")
+                return None
+
     def save_order_book(self, symbol: str, orderbook_data: dict):
 
         with self.Session() as session:
             try:
                 # Find instrument_id
-                instrument = session.query(Instrument).filter_by(symbol=symbol).first()
-                if not instrument:
+                instrument_id = self.get_instrument_id(symbol)
+                if not instrument_id:
                     self.logger.warning(f"No instrument found for symbol {symbol}")
                     return False
 
                 # Delete existing order book for this instrument if it exists
-                session.query(OrderBook).filter(OrderBook.instrument_id == instrument.id).delete(synchronize_session=False)
+                session.query(OrderBook).filter(OrderBook.instrument_id == instrument_id).delete(synchronize_session=False)
 
                 # Extract order book
                 ob = orderbook_data.get("orderBook")
@@ -396,15 +830,15 @@ class DataHandler:
                     return False
 
                 new_orderbook = OrderBook(
-                    instrument_id=instrument.id,
+                    instrument_id=instrument_id,
                     timestamp=datetime.utcnow(),
-                    bids=ob.get("bids", []),
-                    asks=ob.get("asks", [])
+                    bids=self._book_levels(ob.get("bids", [])),
+                    asks=self._book_levels(ob.get("asks", []))
                 )
 
                 session.add(new_orderbook)
                 session.commit()
-                self.logger.info(f"Saved order book for {symbol} (instrument_id={instrument.id})")
+                self.logger.info(f"Saved order book for {symbol} (instrument_id={instrument_id})")
                 return True
 
             except SQLAlchemyError as e:
@@ -433,10 +867,10 @@ class DataHandler:
 
                 # Map symbols to instrument IDs
                 # symbols = [t["symbol"] for t in ticker_data if t.get("symbol")]
-                instrument = session.query(Instrument).filter(Instrument.symbol == symbol).first()
+                instrument_id = self.get_instrument_id(symbol)
 
 
-                if not instrument:
+                if not instrument_id:
                     self.logger.warning(f"No matching instrument found for provided symbol: {symbol}")
                     return False
 
@@ -448,7 +882,7 @@ class DataHandler:
                     last_time = datetime.fromisoformat(last_time_str.replace("Z", "+00:00"))
 
                 ticker_entry = Ticker(
-                    instrument_id=instrument.id,
+                    instrument_id=instrument_id,
                     last=ticker_data.get("last"),
                     lastTime=last_time,
                     # tag=t.get("tag"),
@@ -487,6 +921,269 @@ class DataHandler:
 
 
 
+    # -------------------------------
+    #   Snapshot mode (delta writes)
+    # -------------------------------
+
+    def _snapshot_state(self, source):
+        """Last written state for a snapshot source, loaded from its latest_* table on first use."""
+        state = self._snapshots.get(source)
+        if state is None:
+            table, fields = SNAPSHOTS[source]
+            with self.engine.connect() as conn:
+                rows = conn.execute(select(table.c.instrument_id, *[table.c[f] for f in fields])).all()
+            state = self._snapshots[source] = {r[0]: dict(zip(fields, r[1:])) for r in rows}
+        return state
+
+    def _write_snapshot(self, source, records):
+        """
+        Diff {instrument_id: {field: value}} against the last written state. Changed instruments are
+        upserted into the latest_* table and their changed fields appended to snapshot_changes, in one
+        transaction. Returns the number of instruments written, or None on failure.
+        """
+        table, fields = SNAPSHOTS[source]
+        now = datetime.utcnow()
+
+        with self._snapshots_lock:
+            try:
+                state = self._snapshot_state(source)
+
+                latest, changes = [], []
+                for instrument_id, record in records.items():
+                    previous = state.get(instrument_id)
+                    changed = record if previous is None else {f: v for f, v in record.items() if previous.get(f) != v}
+                    if not changed:
+                        continue
+                    latest.append({"instrument_id": instrument_id, "timestamp": now, **record})
+                    changes.append({
+                        "instrument_id": instrument_id, "timestamp": now, "source": source,
+                        "changes": {f: v.isoformat() if isinstance(v, datetime) else v for f, v in changed.items()},
+                    })
+
+                if latest:
+                    stmt = self._insert(table)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["instrument_id"],
+                        set_={c: stmt.excluded[c] for c in ["timestamp"] + fields},
+                    )
+                    with self.engine.begin() as conn:
+                        conn.execute(stmt, latest)
+                        conn.execute(SnapshotChange.__table__.insert(), changes)
+
+                    # only after the commit, so a failed write is retried on the next poll
+                    for row in latest:
+                        state[row["instrument_id"]] = {f: row[f] for f in fields}
+
+                self.logger.info(f"Snapshot {source}: {len(latest)} of {len(records)} instrument(s) changed")
+                return len(latest)
+
+            except SQLAlchemyError as e:
+                self.logger.error(f"Failed to write {source} snapshot: {e}")
+                return None
+
+    def snapshot_tickers(self, ticker_data: dict):
+        """
+        Delta alternative to save_tickers for polling: only tickers with a changed field are written
+        (latest_tickers upsert + snapshot_changes row). Returns instruments written, False if the
+        payload had nothing to save, None on failure.
+        """
+        if "ticker" in ticker_data:
+            tickers = [ticker_data["ticker"]]
+        else:
+            tickers = ticker_data.get("tickers", [])
+
+        instrument_map = self._symbol_id_map(t["symbol"] for t in tickers if t.get("symbol"))
+        if not instrument_map:
+            self.logger.warning("No matching instruments found for provided tickers")
+            return False
+
+        records = {}
+        for t in tickers:
+            instrument_id = instrument_map.get(t.get("symbol"))
+            if not instrument_id:
+                continue
+            record = {f: t.get(f) for f in TICKER_FIELDS}
+            if record["lastTime"]:
+                # naive UTC, as it reads back from the TIMESTAMP column
+                record["lastTime"] = self._parse_time(record["lastTime"]).astimezone(timezone.utc).replace(tzinfo=None)
+            records[instrument_id] = record
+
+        return self._write_snapshot("ticker", records)
+
+    def snapshot_instrument_status(self, status_data: dict):
+        """Delta alternative to save_instrument_status; same return values as snapshot_tickers."""
+        if "instrumentStatus" in status_data:
+            raw_statuses = status_data["instrumentStatus"]
+        else:
+            raw_statuses = [status_data]
+
+        instrument_map = self._symbol_id_map(s.get("tradeable") for s in raw_statuses if s.get("tradeable"))
+        if not instrument_map:
+            self.logger.warning("No matching instruments found for provided statuses")
+            return False
+
+        records = {
+            instrument_map[s["tradeable"]]: {f: s.get(f) for f in STATUS_FIELDS}
+            for s in raw_statuses if s.get("tradeable") in instrument_map
+        }
+        return self._write_snapshot("status", records)
+
+    # -------------------------------
+    #   Bulk loaders (no ORM objects)
+    # -------------------------------
+
+    def _copy_rows(self, table, columns, rows, conflict_cols=None):
+        """
+        Stream tuples into a table. Postgres: COPY FROM STDIN (via a temp table + INSERT ... ON CONFLICT
+        DO NOTHING when conflict_cols is set). Other dialects: one multi-row Core insert.
+        """
+        if not rows:
+            return 0
+
+        if self.engine.dialect.name != "postgresql":
+            stmt = self._insert(table)
+            if conflict_cols:
+                stmt = stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+            with self.engine.begin() as conn:
+                conn.execute(stmt, [dict(zip(columns, row)) for row in rows])
+            return len(rows)
+
+        # JSON columns go over the wire as JSON text, float8[] as array literals ({{p,s},...})
+        json_idx = [i for i, c in enumerate(columns) if isinstance(table.c[c].type, JSON)]
+        if json_idx:
+            arrays = {i for i in json_idx if self._is_pg_array(table.c[columns[i]])}
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for i in json_idx:
+                    row[i] = json.dumps(row[i], separators=(",", ":"))
+                    if i in arrays:
+                        row[i] = row[i].replace("[", "{").replace("]", "}")
+
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        buf.seek(0)
+
+        cols = ", ".join(f'"{c}"' for c in columns)
+        raw = self.engine.raw_connection()
+        try:
+            cur = raw.cursor()
+            if conflict_cols:
+                tmp = f"tmp_{table.name}"
+                conflict = ", ".join(f'"{c}"' for c in conflict_cols)
+                cur.execute(f"CREATE TEMP TABLE {tmp} ON COMMIT DROP AS SELECT {cols} FROM {table.name} WITH NO DATA")
+                cur.copy_expert(f"COPY {tmp} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+                cur.execute(
+                    f"INSERT INTO {table.name} ({cols}) SELECT {cols} FROM {tmp} ON CONFLICT ({conflict}) DO NOTHING"
+                )
+            else:
+                cur.copy_expert(f"COPY {table.name} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+        return len(rows)
+
+    def bulk_save_tickers(self, ticker_payloads):
+        """
+        Append tickers from one or many get_ticker/get_ticker_list payloads (backfills).
+        Unlike save_tickers nothing is deleted. Returns rows written, or None on failure.
+        """
+        if isinstance(ticker_payloads, dict):
+            ticker_payloads = [ticker_payloads]
+
+        tickers = []
+        for payload in ticker_payloads:
+            if "ticker" in payload:
+                tickers.append(payload["ticker"])
+            else:
+                tickers.extend(payload.get("tickers", []))
+
+        try:
+            instrument_map = self._symbol_id_map(t.get("symbol") for t in tickers)
+            now = datetime.utcnow()
+            last_time_idx = 2 + TICKER_FIELDS.index("lastTime")
+            rows = []
+            for t in tickers:
+                instrument_id = instrument_map.get(t.get("symbol"))
+                if not instrument_id:
+                    continue
+                row = [instrument_id, now] + [t.get(f) for f in TICKER_FIELDS]
+                if t.get("lastTime"):
+                    row[last_time_idx] = self._parse_time(t["lastTime"])
+                rows.append(row)
+
+            written = self._copy_rows(Ticker.__table__, ["instrument_id", "timestamp"] + TICKER_FIELDS, rows)
+            self.logger.info(f"Bulk loaded {written} tickers")
+            return written
+
+        except Exception as e:
+            self.logger.error(f"Failed to bulk load tickers: {e}")
+            return None
+
+    def bulk_save_trades(self, trades_by_symbol: dict):
+        """
+        Append trades for many symbols ({symbol: get_trade_history payload}), deduplicated on
+        (instrument_id, uid, timestamp). Returns rows sent, or None on failure.
+        """
+        try:
+            instrument_map = self._symbol_id_map(trades_by_symbol.keys())
+            rows = []
+            spans = {}  # symbol -> slice of rows
+            for symbol, trade_data in trades_by_symbol.items():
+                instrument_id = instrument_map.get(symbol)
+                if not instrument_id or not trade_data:
+                    continue
+                first = len(rows)
+                for trade in trade_data.get("history", []):
+                    rows.append((
+                        instrument_id, self._parse_time(trade["time"]), trade["price"], trade["size"],
+                        trade["side"], trade.get("type"), self._trade_uid(trade),
+                    ))
+                spans[symbol] = slice(first, len(rows))
+
+            columns = ["instrument_id", "timestamp", "price", "size", "side", "type", "uid"]
+            written = self._copy_rows(TradeHistory.__table__, columns, rows, conflict_cols=TRADE_KEY)
+            # marks may now be stale
+            for symbol in trades_by_symbol:
+                self._trade_hwm.pop(symbol, None)
+            for symbol, span in spans.items():
+                self._mark_trades_written(symbol, (row[1] for row in rows[span]))
+
+            self.logger.info(f"Bulk loaded {written} trades for {len(trades_by_symbol)} symbol(s)")
+            return written
+
+        except Exception as e:
+            self.logger.error(f"Failed to bulk load trades: {e}")
+            return None
+
+    def bulk_save_order_books(self, books_by_symbol: dict):
+        """
+        Append order book snapshots for many symbols ({symbol: get_order_book payload}).
+        Returns rows written, or None on failure.
+        """
+        try:
+            instrument_map = self._symbol_id_map(books_by_symbol.keys())
+            now = datetime.utcnow()
+            rows = []
+            for symbol, orderbook_data in books_by_symbol.items():
+                instrument_id = instrument_map.get(symbol)
+                ob = (orderbook_data or {}).get("orderBook")
+                if not instrument_id or not ob:
+                    continue
+                rows.append((instrument_id, now, ob.get("bids", []), ob.get("asks", [])))
+
+            columns = ["instrument_id", "timestamp", "bids", "asks"]
+            written = self._copy_rows(OrderBook.__table__, columns, rows)
+            self.logger.info(f"Bulk loaded {written} order books")
+            return written
+
+        except Exception as e:
+            self.logger.error(f"Failed to bulk load order books: {e}")
+            return None
+
+
     # GETS
     
     def get_instruments(self):
@@ -586,6 +1283,209 @@ class DataHandler:
             self.logger.info(f"Could not find matching instrument for symbol: {symbol}")
             return None
 
+    # -------------------------------
+    #   Columnar reads (DataFrames)
+    # -------------------------------
+
+    def _read_df(self, table, symbol, columns, start, end, time_column, filters=None):
+        """
+        One Core SELECT for a symbol/time range, built into a DataFrame column-wise with real dtypes.
+        Numeric columns are cast to float8 in SQL so no Decimals are created.
+        Postgres streams the result through COPY TO STDOUT into the C CSV parser.
+        """
+        try:
+            cols = [table.c[c] for c in columns]
+        except KeyError as e:
+            raise ValueError(f"Unknown column for {table.name}: {e}")
+
+        if "instrument_id" in table.c:
+            instrument_id = self.get_instrument_id(symbol)
+            if instrument_id is None:
+                self.logger.info(f"Could not find matching instrument for symbol: {symbol}")
+                return pd.DataFrame(columns=columns)
+            key = [table.c.instrument_id == instrument_id]
+        else:
+            key = [table.c.symbol == symbol]
+        key += list(filters or [])
+
+        selected = []
+        dtypes = {}
+        dates = []
+        json_cols = []
+        for c in cols:
+            if isinstance(c.type, Float):
+                selected.append(c)
+                dtypes[c.name] = "float64"
+            elif isinstance(c.type, Numeric):
+                selected.append(cast(c, Float).label(c.name))
+                dtypes[c.name] = "float64"
+            elif isinstance(c.type, Boolean):
+                selected.append(c)
+                dtypes[c.name] = "boolean"
+            elif isinstance(c.type, TIMESTAMP):
+                selected.append(c)
+                dates.append(c.name)
+            elif isinstance(c.type, JSON):
+                selected.append(c)
+                json_cols.append(c.name)
+            else:
+                selected.append(c)
+
+        tc = table.c[time_column]
+        stmt = select(*selected).where(*key)
+        if start is not None:
+            stmt = stmt.where(tc >= start)
+        if end is not None:
+            stmt = stmt.where(tc < end)
+        stmt = stmt.order_by(tc)
+
+        if self.engine.dialect.name == "postgresql":
+            sql = stmt.compile(dialect=self.engine.dialect, compile_kwargs={"literal_binds": True})
+            buf = io.StringIO()
+            raw = self.engine.raw_connection()
+            try:
+                raw.cursor().copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", buf)
+            finally:
+                raw.close()
+            buf.seek(0)
+            df = pd.read_csv(buf, dtype=dtypes, parse_dates=dates, date_format="ISO8601", true_values=["t"], false_values=["f"])
+            for c in json_cols:
+                if self._is_pg_array(table.c[c]):
+                    df[c] = df[c].map(lambda v: json.loads(v.replace("{", "[").replace("}", "]"), parse_int=float))
+                else:
+                    df[c] = df[c].map(json.loads)
+        else:
+            with self.engine.connect() as conn:
+                df = pd.read_sql(stmt, conn, dtype=dtypes, parse_dates=dates)
+
+        self.logger.info(f"Loaded {len(df)} {table.name} row(s) for {symbol}")
+        return df
+
+    def get_tickers_df(self, symbol, columns=None, start=None, end=None, time_column="timestamp"):
+        """
+        Tickers for a symbol as a DataFrame, ordered by time_column ("timestamp" or "lastTime").
+        columns defaults to timestamp + every ticker field; start/end filter [start, end).
+        """
+        columns = columns or ["timestamp"] + TICKER_FIELDS
+        return self._read_df(Ticker.__table__, symbol, columns, start, end, time_column)
+
+    def get_trades_df(self, symbol, columns=None, start=None, end=None):
+        """Trades for a symbol as a DataFrame ordered by timestamp; start/end filter [start, end)."""
+        columns = columns or ["timestamp", "price", "size", "side", "type"]
+        return self._read_df(TradeHistory.__table__, symbol, columns, start, end, "timestamp")
+
+    def get_order_books_df(self, symbol, start=None, end=None):
+        """Order book snapshots for a symbol (timestamp, bids, asks) ordered by timestamp."""
+        return self._read_df(OrderBook.__table__, symbol, ["timestamp", "bids", "asks"], start, end, "timestamp")
+
+    def get_latest_df(self, source="ticker"):
+        """Current latest_tickers ("ticker") or latest_instrument_status ("status") rows, with symbol."""
+        table, fields = SNAPSHOTS[source]
+        stmt = (
+            select(Instrument.symbol, table.c.timestamp, *[table.c[f] for f in fields])
+            .join(Instrument, Instrument.id == table.c.instrument_id)
+        )
+        with self.engine.connect() as conn:
+            return pd.read_sql(stmt, conn)
+
+    def get_snapshot_changes_df(self, symbol, source=None, start=None, end=None):
+        """Change log for a symbol (timestamp, source, changes dict) ordered by timestamp."""
+        table = SnapshotChange.__table__
+        filters = [table.c.source == source] if source else None
+        return self._read_df(table, symbol, ["timestamp", "source", "changes"], start, end, "timestamp", filters)
+
+    def get_ohlcv_df(self, symbol, timeframe="1m", start=None, end=None, exchange=EXCHANGE, fill=False):
+        """
+        Candles for a symbol/timeframe (timestamp, open, high, low, close, volume) ordered by timestamp.
+        Bars only exist for intervals with trades; fill=True inserts the missing bars as flat
+        candles at the previous close with zero volume.
+        """
+        columns = ["timestamp", "open", "high", "low", "close", "volume"]
+        filters = [OHLCV.__table__.c.timeframe == timeframe, OHLCV.__table__.c.exchange == exchange]
+        df = self._read_df(OHLCV.__table__, symbol, columns, start, end, "timestamp", filters)
+        if not fill or df.empty:
+            return df
+
+        df = df.set_index("timestamp")
+        df = df.reindex(pd.date_range(df.index[0], df.index[-1], freq=timeframe_delta(timeframe)))
+        df["close"] = df["close"].ffill()
+        for c in ("open", "high", "low"):
+            df[c] = df[c].fillna(df["close"])
+        df["volume"] = df["volume"].fillna(0.0)
+        return df.rename_axis("timestamp").reset_index()
+
+    def get_ohlcv_panel(self, symbols, timeframe="1m", start=None, exchange=EXCHANGE):
+        """
+        Close and volume for many symbols in one query, as two (timestamp x symbol) DataFrames.
+        Bars missing for a symbol are filled flat (close carried forward, zero volume).
+        """
+        t = OHLCV.__table__
+        stmt = select(t.c.timestamp, t.c.symbol, t.c.close, t.c.volume).where(
+            t.c.symbol.in_(list(symbols)), t.c.timeframe == timeframe, t.c.exchange == exchange
+        )
+        if start is not None:
+            stmt = stmt.where(t.c.timestamp >= start)
+
+        with self.engine.connect() as conn:
+            df = pd.read_sql(stmt, conn, parse_dates=["timestamp"])
+
+        if df.empty:
+            empty = pd.DataFrame(columns=list(symbols), dtype="float64")
+            return empty, empty.copy()
+
+        close = df.pivot(index="timestamp", columns="symbol", values="close").sort_index()
+        volume = df.pivot(index="timestamp", columns="symbol", values="volume").reindex(close.index)
+        full = pd.date_range(close.index[0], close.index[-1], freq=timeframe_delta(timeframe))
+        close = close.reindex(full).ffill()
+        volume = volume.reindex(full).fillna(0.0)
+        return close, volume
+
+    def upsert_ohlcv(self, rows):
+        """
+        Insert or replace candles. rows: dicts with exchange, symbol, timeframe, timestamp, open,
+        high, low, close, volume. Returns rows written, or None on failure.
+        """
+        if not rows:
+            return 0
+        try:
+            stmt = self._insert(OHLCV.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["exchange", "symbol", "timeframe", "timestamp"],
+                set_={c: stmt.excluded[c] for c in ("open", "high", "low", "close", "volume")},
+            )
+            with self.engine.begin() as conn:
+                conn.execute(stmt, rows)
+            return len(rows)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Failed to save candles: {e}")
+            return None
+
+    # -------------------------------
+    #   Research lake export
+    # -------------------------------
+
+    def export_to_lake(self, lake, symbol, tables=("tickers", "trades", "order_books")):
+        """
+        Append rows newer than the lake's high-water mark for a symbol (see data/lake.py).
+        Returns {table: rows exported}; a table that fails is logged and reported as None.
+        """
+        readers = {
+            "tickers": self.get_tickers_df,
+            "trades": self.get_trades_df,
+            "order_books": self.get_order_books_df,
+        }
+        exported = {}
+        for table in tables:
+            try:
+                hwm = lake.high_water_mark(table, symbol)
+                df = readers[table](symbol, start=hwm)
+                if hwm is not None:
+                    df = df[df["timestamp"] > hwm]  # start is inclusive
+                exported[table] = lake.append(table, symbol, df)
+            except Exception as e:
+                self.logger.error(f"Failed to export {table} for {symbol} to lake: {e}")
+                exported[table] = None
+        return exported
 
     # def add_trade(self, trade_data: dict):
     #     """Insert a trade into trade_history"""
@@ -600,20 +1500,10 @@ class DataHandler:
     #             session.rollback()  # ignore duplicate constraint
     #         return trade
 
-    # def get_trades_df(self, symbol: str):
-    #     """Load trades into a pandas DataFrame"""
-    #     import pandas as pd
-    #     with self.Session() as session:
-    #         inst = session.query(Instrument).filter_by(symbol=symbol).first()
-    #         if not inst:
-    #             return pd.DataFrame()
-    #         trades = session.query(TradeHistory).filter_by(instrument_id=inst.instrument_id).all()
-    #         df = pd.DataFrame([{
-    #             "timestamp": t.timestamp,
-    #             "side": t.side,
-    #             "price": float(t.price),
-    #             "size": float(t.size)
-    #         } for t in trades])
-    #         self.logger.info("Loaded trade data")
-
-    #         return df.sort_values("timestamp")
+
+# per-method DB time; the instrument cache lookups are too small to be worth a timer
+METRICS.instrument(
+    DataHandler, "db_call_seconds",
+    prefixes=("save_", "bulk_save_", "append_", "snapshot_", "upsert_", "get_"),
+    exclude=("get_instrument_id", "get_instrument_meta"),
+)
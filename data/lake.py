@@ -0,0 +1,165 @@
+import os
+import shutil
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from config.settings import LAKE_PATH, LAKE_FORMAT
+
+# pyarrow is optional: only research boxes that use the lake need it
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+TABLES = ("tickers", "trades", "order_books")
+
+
+class MarketDataLake:
+    """
+    Local market-data store for research: one Parquet (or Arrow IPC) file per append, laid out as
+    <root>/<table>/symbol=<symbol>/date=<YYYY-MM-DD>/part-<ns>.<ext>.
+
+    Reads go through pyarrow.dataset, so the symbol directory and date partitions are pruned before
+    any file is opened and the time filter is pushed down to row groups. Files are memory-mapped;
+    with format="ipc" (uncompressed Arrow) reads are zero-copy.
+    """
+
+    def __init__(self, logger, root=LAKE_PATH, format=LAKE_FORMAT):
+        if pa is None:
+            raise ImportError("MarketDataLake needs pyarrow (pip install pyarrow)")
+        if format not in ("parquet", "ipc"):
+            raise ValueError("format must be 'parquet' or 'ipc'")
+
+        self.logger = logger
+        self.root = root
+        self.format = format
+        self.ext = "parquet" if format == "parquet" else "arrow"
+        self.fs = pafs.LocalFileSystem(use_mmap=True)
+        self.partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+        self.logger.info(f"Initialized MarketDataLake ({format}) at {root}")
+
+    def _symbol_dir(self, table, symbol):
+        if table not in TABLES:
+            raise ValueError(f"Unknown lake table {table}, expected one of {', '.join(TABLES)}")
+        return os.path.join(self.root, table, f"symbol={symbol}")
+
+    def _dataset(self, table, symbol):
+        path = self._symbol_dir(table, symbol)
+        if not os.path.isdir(path):
+            return None
+        return ds.dataset(path, format=self.format, filesystem=self.fs, partitioning=self.partitioning)
+
+    def _write(self, table, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a hidden name then rename, so dataset discovery never sees a partial file
+        tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path))
+        if self.format == "parquet":
+            pq.write_table(table, tmp, compression="zstd")
+        else:
+            feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+
+    # -----------------------
+    # Writes
+    # -----------------------
+
+    def append(self, table, symbol, df, time_column="timestamp"):
+        """
+        Append rows (DataFrame with a time_column) for a symbol; one new file per date touched.
+        Returns rows written.
+        """
+        if df is None or df.empty:
+            return 0
+
+        base = self._symbol_dir(table, symbol)
+        dates = pd.to_datetime(df[time_column]).dt.strftime("%Y-%m-%d")
+        written = 0
+        for date, part in df.groupby(dates.to_numpy(), sort=True):
+            path = os.path.join(base, f"date={date}", f"part-{time.time_ns()}.{self.ext}")
+            self._write(pa.Table.from_pandas(part, preserve_index=False), path)
+            written += len(part)
+
+        self.logger.info(f"Appended {written} {table} row(s) for {symbol} to lake")
+        return written
+
+    def compact(self, table, symbol, date):
+        """Merge a date partition's part files into one, sorted by timestamp."""
+        date_dir = os.path.join(self._symbol_dir(table, symbol), f"date={date}")
+        if not os.path.isdir(date_dir):
+            return 0
+        parts = [os.path.join(date_dir, f) for f in os.listdir(date_dir) if f.endswith(self.ext)]
+        if len(parts) < 2:
+            return len(parts)
+
+        merged = ds.dataset(parts, format=self.format, filesystem=self.fs).to_table()
+        if "timestamp" in merged.column_names:
+            merged = merged.sort_by("timestamp")
+
+        # "_" prefix: skipped by dataset discovery until it is swapped in
+        staging = os.path.join(self._symbol_dir(table, symbol), f"_compact-{date}")
+        shutil.rmtree(staging, ignore_errors=True)
+        self._write(merged, os.path.join(staging, f"part-{time.time_ns()}.{self.ext}"))
+        shutil.rmtree(date_dir)
+        os.replace(staging, date_dir)
+
+        self.logger.info(f"Compacted {len(parts)} {table} file(s) for {symbol} on {date}")
+        return 1
+
+    # -----------------------
+    # Reads
+    # -----------------------
+
+    def read_table(self, table, symbol, columns=None, start=None, end=None, time_column="timestamp"):
+        """
+        Rows for a symbol as a pyarrow Table; start/end (datetimes) filter [start, end) on time_column.
+        Only the date partitions overlapping the range are opened.
+        """
+        dataset = self._dataset(table, symbol)
+        if dataset is None:
+            return None
+
+        expr = None
+        if start is not None:
+            expr = (ds.field("date") >= start.strftime("%Y-%m-%d")) & (ds.field(time_column) >= pa.scalar(start))
+        if end is not None:
+            upper = (ds.field("date") <= end.strftime("%Y-%m-%d")) & (ds.field(time_column) < pa.scalar(end))
+            expr = upper if expr is None else expr & upper
+
+        # the date partition key is only used for pruning
+        columns = list(columns) if columns is not None else [n for n in dataset.schema.names if n != "date"]
+        result = dataset.to_table(columns=columns, filter=expr)
+        if time_column in result.column_names:
+            result = result.sort_by(time_column)
+        return result
+
+    def read(self, table, symbol, columns=None, start=None, end=None, time_column="timestamp"):
+        """Same as read_table, as a DataFrame (empty if the symbol has no data)."""
+        result = self.read_table(table, symbol, columns, start, end, time_column)
+        if result is None:
+            return pd.DataFrame(columns=columns)
+        return result.to_pandas()
+
+    def high_water_mark(self, table, symbol, time_column="timestamp"):
+        """Newest stored time_column value for a symbol, or None."""
+        dataset = self._dataset(table, symbol)
+        if dataset is None:
+            return None
+
+        dates = sorted(os.listdir(self._symbol_dir(table, symbol)))
+        dates = [d.split("=", 1)[1] for d in dates if d.startswith("date=")]
+        if not dates:
+            return None
+        last = dataset.to_table(columns=[time_column], filter=ds.field("date") == dates[-1])
+        if last.num_rows == 0:
+            return None
+        newest = pc.max(last[time_column]).as_py()
+        return newest if isinstance(newest, datetime) else None
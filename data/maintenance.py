@@ -0,0 +1,314 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text, UniqueConstraint
+from sqlalchemy.schema import CreateIndex
+
+from data.data_handler import Instrument, TradeHistory, Ticker, OrderBook, SnapshotChange
+from config.settings import (
+    PARTITION_INTERVAL, PARTITION_PREMAKE, RETENTION_DAYS, RETENTION_DELETE_BATCH,
+)
+
+
+# tables that only grow with time; all keyed by (instrument_id, timestamp)
+TIME_SERIES_TABLES = {t.__tablename__: t.__table__ for t in (TradeHistory, Ticker, OrderBook, SnapshotChange)}
+
+
+class TimeSeriesMaintenance:
+    """
+    Schema upgrades, partitioning and retention for trade_history / tickers / order_books / snapshot_changes.
+
+    Postgres: tables can be converted to native RANGE (timestamp) partitioning (one partition per
+    day or month). rollover() then pre-creates upcoming partitions and drops whole partitions past
+    retention, which is a metadata operation rather than a DELETE.
+    Other dialects (SQLite stand-in) keep plain tables; retention deletes in per-instrument batches
+    over the (instrument_id, timestamp) index.
+
+    Run rollover() from cron / the scheduler, e.g. once a day.
+    """
+
+    def __init__(self, data_handler, logger, interval=PARTITION_INTERVAL, premake=PARTITION_PREMAKE,
+                 retention_days=None, delete_batch=RETENTION_DELETE_BATCH):
+        if interval not in ("day", "month"):
+            raise ValueError("interval must be 'day' or 'month'")
+        self.data_handler = data_handler
+        self.engine = data_handler.engine
+        self.logger = logger
+        self.interval = interval
+        self.premake = premake
+        # table -> days to keep (0 / None keeps everything)
+        self.retention_days = {**RETENTION_DAYS, **(retention_days or {})}
+        self.delete_batch = delete_batch
+
+    @property
+    def is_postgres(self):
+        return self.engine.dialect.name == "postgresql"
+
+    # -----------------------
+    # Partition naming
+    # -----------------------
+
+    def _period_start(self, ts):
+        if self.interval == "day":
+            return datetime(ts.year, ts.month, ts.day)
+        return datetime(ts.year, ts.month, 1)
+
+    def _next_period(self, start):
+        if self.interval == "day":
+            return start + timedelta(days=1)
+        return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+    def _partition_name(self, table_name, start):
+        fmt = "%Y_%m_%d" if self.interval == "day" else "%Y_%m"
+        return f"{table_name}_p{start.strftime(fmt)}"
+
+    @staticmethod
+    def _partition_bounds(table_name, partition_name):
+        """(start, end) parsed back from a _partition_name, or None (e.g. the default partition)."""
+        m = re.fullmatch(rf"{table_name}_p(\d{{4}})_(\d{{2}})(?:_(\d{{2}}))?", partition_name)
+        if not m:
+            return None
+        year, month, day = int(m[1]), int(m[2]), m[3]
+        if day:
+            start = datetime(year, month, int(day))
+            return start, start + timedelta(days=1)
+        start = datetime(year, month, 1)
+        return start, datetime(year + month // 12, month % 12 + 1, 1)
+
+    # -----------------------
+    # Schema upgrades
+    # -----------------------
+
+    def upgrade_indexes(self):
+        """
+        Bring existing tables up to the current schema: composite (instrument_id, timestamp) indexes
+        replace the old single-column timestamp ones, and the trade dedup key gains timestamp.
+        create_all() only creates missing tables, so existing databases need this once.
+        Returns False if trade_history could not get its uid column first.
+        """
+        # tables from before the dedup key have no uid to put in the constraint yet
+        if not self.data_handler.migrate_trade_uid():
+            self.logger.error("trade_history uid migration failed, indexes left as they are")
+            return False
+
+        with self.engine.begin() as conn:
+            for name, table in TIME_SERIES_TABLES.items():
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+                conn.execute(text(f"DROP INDEX IF EXISTS ix_{name}_timestamp"))
+
+            if self.is_postgres:
+                conn.execute(text(
+                    "ALTER TABLE trade_history DROP CONSTRAINT IF EXISTS uq_trade_history_instrument_uid"
+                ))
+                exists = conn.execute(text(
+                    "SELECT 1 FROM pg_constraint WHERE conname = 'uq_trade_history_instrument_uid_ts'"
+                )).first()
+                if not exists:
+                    conn.execute(text(
+                        "ALTER TABLE trade_history ADD CONSTRAINT uq_trade_history_instrument_uid_ts "
+                        "UNIQUE (instrument_id, uid, timestamp)"
+                    ))
+        self.logger.info("Upgraded time-series indexes")
+        return True
+
+    def compact_types(self):
+        """
+        Postgres: convert existing numeric / JSON columns to the compact types in the current schema
+        (float8 prices and sizes, int contractValueTradePrecision, float8[][] order book levels).
+        Other dialects store these as REAL/TEXT already, so there is nothing to rewrite.
+        Each ALTER rewrites its table under an exclusive lock: run once, in a maintenance window,
+        before partition_table() (the partitioned copy keeps whatever column types it finds).
+        """
+        if not self.is_postgres:
+            return False
+
+        def column_type(conn, table_name, column):
+            return conn.execute(text(
+                "SELECT data_type FROM information_schema.columns WHERE table_name = :t AND column_name = :c"
+            ), {"t": table_name, "c": column}).scalar()
+
+        with self.engine.begin() as conn:
+            for table in (Instrument.__table__, TradeHistory.__table__):
+                for column in table.columns:
+                    target = column.type.compile(dialect=self.engine.dialect)
+                    if column_type(conn, table.name, column.name) == "numeric":
+                        conn.execute(text(
+                            f'ALTER TABLE {table.name} ALTER COLUMN "{column.name}" '
+                            f'TYPE {target} USING "{column.name}"::{target}'
+                        ))
+
+            # json -> float8[][]: USING can't hold the subquery, so go through a new column
+            for side in ("bids", "asks"):
+                if column_type(conn, "order_books", side) != "json":
+                    continue
+                conn.execute(text(f"ALTER TABLE order_books ADD COLUMN {side}_levels float8[][]"))
+                conn.execute(text(
+                    f"UPDATE order_books SET {side}_levels = COALESCE((SELECT array_agg(ARRAY[(l->>0)::float8, "
+                    f"(l->>1)::float8]) FROM json_array_elements({side}) l), '{{}}')"
+                ))
+                conn.execute(text(f"ALTER TABLE order_books DROP COLUMN {side}"))
+                conn.execute(text(f"ALTER TABLE order_books RENAME COLUMN {side}_levels TO {side}"))
+                conn.execute(text(f"ALTER TABLE order_books ALTER COLUMN {side} SET NOT NULL"))
+
+        self.data_handler.book_levels_ready = self.data_handler.check_book_levels()
+        self.logger.info("Converted numeric and order book columns to compact types")
+        return True
+
+    def is_partitioned(self, table_name):
+        if not self.is_postgres:
+            return False
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name"
+            ), {"name": table_name}).first() is not None
+
+    def partition_table(self, table_name):
+        """
+        Convert a plain table to RANGE (timestamp) partitioning (Postgres only), copying existing rows.
+        Runs in one transaction and rewrites the table: schedule it in a quiet window for big tables.
+        """
+        if not self.is_postgres:
+            self.logger.warning(f"Partitioning needs Postgres, leaving {table_name} as is")
+            return False
+        if self.is_partitioned(table_name):
+            return True
+        # the copy takes the old table's shape; give trade_history its uid + key first
+        if table_name == "trade_history" and not self.data_handler.migrate_trade_uid():
+            self.logger.error("trade_history uid migration failed, not partitioning")
+            return False
+
+        table = TIME_SERIES_TABLES[table_name]
+        new = f"{table_name}_partitioned"
+        pk = ", ".join(c.name for c in table.primary_key.columns)
+
+        with self.engine.begin() as conn:
+            bounds = conn.execute(text(f'SELECT min("timestamp"), max("timestamp") FROM {table_name}')).first()
+
+            conn.execute(text(
+                f'CREATE TABLE {new} (LIKE {table_name} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")'
+            ))
+            self._create_partitions(conn, new, bounds[0], bounds[1], name_as=table_name)
+            conn.execute(text(f"INSERT INTO {new} SELECT * FROM {table_name}"))
+
+            # keep the id sequence alive past the old table
+            seq = conn.execute(text(f"SELECT pg_get_serial_sequence('{table_name}', 'id')")).scalar()
+            if seq:
+                conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {new}.id"))
+            conn.execute(text(f"DROP TABLE {table_name}"))
+            conn.execute(text(f"ALTER TABLE {new} RENAME TO {table_name}"))
+
+            # the partition key has to be part of every primary key / unique constraint
+            conn.execute(text(f'ALTER TABLE {table_name} ADD PRIMARY KEY ({pk}, "timestamp")'))
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint):
+                    cols = [c.name for c in constraint.columns]
+                    conn.execute(text(
+                        f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint.name} UNIQUE ({', '.join(cols)})"
+                    ))
+            for fk in table.foreign_keys:
+                conn.execute(text(
+                    f"ALTER TABLE {table_name} ADD FOREIGN KEY ({fk.parent.name}) "
+                    f"REFERENCES {fk.column.table.name} ({fk.column.name}) ON DELETE {fk.ondelete or 'NO ACTION'}"
+                ))
+            for index in table.indexes:
+                conn.execute(CreateIndex(index))
+
+        self.logger.info(f"Partitioned {table_name} by {self.interval}")
+        return True
+
+    def _create_partitions(self, conn, table_name, first=None, last=None, name_as=None):
+        """Create partitions from first (or now) through now + premake periods, plus a default partition."""
+        name_as = name_as or table_name
+        now = datetime.utcnow()
+        start = self._period_start(min(first or now, now))
+        end = self._period_start(max(last or now, now))
+        for _ in range(self.premake):
+            end = self._next_period(end)
+
+        created = 0
+        while start <= end:
+            upper = self._next_period(start)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self._partition_name(name_as, start)} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{upper.isoformat()}')"
+            ))
+            start = upper
+            created += 1
+
+        # catches anything outside the pre-created range instead of failing the insert
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name_as}_default PARTITION OF {table_name} DEFAULT"))
+        return created
+
+    def _partitions(self, conn, table_name):
+        return [r[0] for r in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name ORDER BY c.relname"
+        ), {"name": table_name})]
+
+    # -----------------------
+    # Retention / rollover
+    # -----------------------
+
+    def apply_retention(self, table_name, keep_days=None):
+        """
+        Drop data older than keep_days. Partitioned: detach + drop whole partitions past the cutoff.
+        Otherwise: batched DELETEs per instrument. Returns partitions dropped / rows deleted.
+        """
+        keep_days = keep_days if keep_days is not None else self.retention_days.get(table_name)
+        if not keep_days:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+
+        if self.is_partitioned(table_name):
+            dropped = 0
+            with self.engine.begin() as conn:
+                for partition in self._partitions(conn, table_name):
+                    bounds = self._partition_bounds(table_name, partition)
+                    if bounds and bounds[1] <= cutoff:
+                        conn.execute(text(f"ALTER TABLE {table_name} DETACH PARTITION {partition}"))
+                        conn.execute(text(f"DROP TABLE {partition}"))
+                        dropped += 1
+            self.logger.info(f"Dropped {dropped} {table_name} partition(s) older than {cutoff:%Y-%m-%d}")
+            return dropped
+
+        table = TIME_SERIES_TABLES[table_name]
+        deleted = 0
+        # from the instruments table, not the DataHandler cache: rows of instruments added since it was
+        # filled must not be skipped (the instrument_id foreign key means no row is outside this list)
+        with self.engine.connect() as conn:
+            instrument_ids = conn.execute(select(Instrument.id)).scalars().all()
+        for instrument_id in instrument_ids:
+            while True:
+                # (instrument_id, timestamp) range on the composite index, bounded per transaction
+                batch = (
+                    table.select().with_only_columns(table.c.id)
+                    .where(table.c.instrument_id == instrument_id, table.c.timestamp < cutoff)
+                    .limit(self.delete_batch)
+                    .scalar_subquery()
+                )
+                with self.engine.begin() as conn:
+                    n = conn.execute(table.delete().where(table.c.id.in_(batch))).rowcount
+                deleted += n
+                if n < self.delete_batch:
+                    break
+
+        self.logger.info(f"Deleted {deleted} {table_name} row(s) older than {cutoff:%Y-%m-%d}")
+        return deleted
+
+    def rollover(self):
+        """Pre-create upcoming partitions and apply retention on every time-series table."""
+        summary = {}
+        for table_name in TIME_SERIES_TABLES:
+            try:
+                created = 0
+                if self.is_partitioned(table_name):
+                    with self.engine.begin() as conn:
+                        created = self._create_partitions(conn, table_name)
+                summary[table_name] = {"partitions": created, "retention": self.apply_retention(table_name)}
+            except Exception as e:
+                self.logger.error(f"Rollover failed for {table_name}: {e}")
+                summary[table_name] = None
+        return summary
@@ -0,0 +1,152 @@
+from operator import neg
+from sortedcontainers import SortedDict
+
+
+class L2Book:
+    """
+    In-memory L2 order book for one instrument.
+
+    Price levels are kept in SortedDicts (bids keyed by -price so index 0 is always the best level),
+    so a delta is an O(log n) insert/delete and top-of-book lookups are O(1).
+    Sizes are in contracts, prices in quote currency, as returned by Kraken Futures.
+    """
+
+    def __init__(self, symbol=None):
+        self.symbol = symbol
+        self.bids = SortedDict(neg)
+        self.asks = SortedDict()
+        self.seq = None
+
+    @classmethod
+    def from_rest(cls, symbol, orderbook_data):
+        """Build from an ExchangeWrapper.get_order_book response."""
+        book = cls(symbol)
+        ob = orderbook_data.get("orderBook", {})
+        book.apply_snapshot(ob.get("bids", []), ob.get("asks", []))
+        return book
+
+    # -----------------------
+    # Updates
+    # -----------------------
+
+    def apply_snapshot(self, bids, asks, seq=None):
+        """Replace the book. Levels are [price, size] pairs or {"price", "qty"} dicts."""
+        self.bids = SortedDict(neg, self._levels(bids))
+        self.asks = SortedDict(self._levels(asks))
+        self.seq = seq
+
+    def apply_delta(self, side, price, size, seq=None):
+        """Set one level; size 0 removes it. side is "buy"/"bid" or "sell"/"ask"."""
+        levels = self.bids if side in ("buy", "bid", "bids") else self.asks
+        if size:
+            levels[price] = size
+        else:
+            levels.pop(price, None)
+        if seq is not None:
+            self.seq = seq
+
+    @staticmethod
+    def _levels(levels):
+        for level in levels:
+            if isinstance(level, dict):
+                yield level["price"], level["qty"]
+            else:
+                yield level[0], level[1]
+
+    # -----------------------
+    # Queries
+    # -----------------------
+
+    def best_bid(self):
+        """(price, size) or None"""
+        return self.bids.peekitem(0) if self.bids else None
+
+    def best_ask(self):
+        """(price, size) or None"""
+        return self.asks.peekitem(0) if self.asks else None
+
+    def mid(self):
+        if not self.bids or not self.asks:
+            return None
+        return (self.bids.peekitem(0)[0] + self.asks.peekitem(0)[0]) / 2
+
+    def spread(self):
+        if not self.bids or not self.asks:
+            return None
+        return self.asks.peekitem(0)[0] - self.bids.peekitem(0)[0]
+
+    def spread_bps(self):
+        mid = self.mid()
+        return self.spread() / mid * 1e4 if mid else None
+
+    def depth_at_bps(self, bps, side=None):
+        """
+        Size resting within bps of mid. side: "bid", "ask" or None for both sides combined.
+        """
+        mid = self.mid()
+        if mid is None:
+            return 0.0
+
+        depth = 0.0
+        if side in (None, "bid", "buy"):
+            floor = mid * (1 - bps / 1e4)
+            # bids are keyed by -price: irange(maximum=floor) walks prices >= floor, best first
+            for price in self.bids.irange(maximum=floor):
+                depth += self.bids[price]
+        if side in (None, "ask", "sell"):
+            cap = mid * (1 + bps / 1e4)
+            for price in self.asks.irange(maximum=cap):
+                depth += self.asks[price]
+        return depth
+
+    def imbalance(self, bps=None, levels=None):
+        """
+        (bid size - ask size) / (bid size + ask size), in [-1, 1].
+        Over the levels within bps of mid, the top n levels, or the full book.
+        """
+        if bps is not None:
+            bid_size = self.depth_at_bps(bps, "bid")
+            ask_size = self.depth_at_bps(bps, "ask")
+        else:
+            bid_size = sum(self.bids.values()[:levels])
+            ask_size = sum(self.asks.values()[:levels])
+
+        total = bid_size + ask_size
+        return (bid_size - ask_size) / total if total else 0.0
+
+    def vwap(self, size, side):
+        """
+        Average fill price for a market order of `size` contracts.
+        side="buy" walks the asks, side="sell" walks the bids. None if the book is too thin.
+        """
+        levels = self.asks if side in ("buy", "bid") else self.bids
+        remaining = size
+        notional = 0.0
+
+        for price, level_size in levels.items():
+            take = min(remaining, level_size)
+            notional += take * price
+            remaining -= take
+            if remaining <= 0:
+                return notional / size
+        return None
+
+    def slippage_bps(self, size, side):
+        """VWAP distance from mid for a market order of `size`, in bps (None if too thin)."""
+        vwap = self.vwap(size, side)
+        mid = self.mid()
+        if vwap is None or not mid:
+            return None
+        return abs(vwap - mid) / mid * 1e4
+
+    def to_dict(self, depth=None):
+        """REST-shaped snapshot ({"orderBook": {"bids", "asks"}}), e.g. for DataHandler.save_order_book."""
+        return {
+            "orderBook": {
+                "bids": [[p, s] for p, s in self.bids.items()[:depth]],
+                "asks": [[p, s] for p, s in self.asks.items()[:depth]],
+            }
+        }
+
+    def __len__(self):
+        return len(self.bids) + len(self.asks)
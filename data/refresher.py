@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from config.settings import REFRESH_MAX_WORKERS, REFRESH_MAX_IN_FLIGHT, TRADE_BACKFILL_MAX_PAGES
+
+
+class MarketDataRefresher:
+    """
+    Fans the per-symbol order book + trade refresh out over a bounded thread pool.
+    Fetches go through the ExchangeWrapper, writes still land through the DataHandler.
+    """
+
+    def __init__(self, exchange, data_handler, logger,
+                 max_workers=REFRESH_MAX_WORKERS, max_in_flight=REFRESH_MAX_IN_FLIGHT,
+                 incremental_trades=None, max_backfill_pages=TRADE_BACKFILL_MAX_PAGES):
+        self.exchange = exchange
+        self.data_handler = data_handler
+        self.logger = logger
+        self.max_workers = max_workers
+
+        # append new trades past the stored high-water mark instead of delete + reinsert;
+        # by default only once trade_history has the uid dedup key (DataHandler.migrate_trade_uid)
+        if incremental_trades is None:
+            incremental_trades = getattr(data_handler, "trade_uid_ready", False)
+        self.incremental_trades = incremental_trades
+        self.max_backfill_pages = max_backfill_pages
+
+        # caps concurrent HTTP requests independently of the worker count (DB writes don't hold a slot)
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.last_cycle = None
+
+        self.logger.info(f"Initialized MarketDataRefresher (workers={max_workers}, in_flight={max_in_flight})")
+
+    def _fetch(self, fn, *args, **kwargs):
+        with self._in_flight:
+            return fn(*args, **kwargs)
+
+    def _refresh_symbol(self, symbol, order_books=True, trades=True):
+        """Fetch + save one symbol. Returns True if every requested part was saved."""
+        ok = True
+
+        if order_books:
+            order_book = self._fetch(self.exchange.get_order_book, symbol)
+            if order_book:
+                ok &= bool(self.data_handler.save_order_book(symbol, order_book))
+            else:
+                ok = False
+
+        if trades and self.incremental_trades:
+            ok &= self._append_trades(symbol)
+        elif trades:
+            trade_data = self._fetch(self.exchange.get_trade_history, symbol)
+            if trade_data:
+                ok &= bool(self.data_handler.save_trade_history(symbol, trade_data))
+            else:
+                ok = False
+
+        return ok
+
+    def _append_trades(self, symbol):
+        """
+        Fetch the latest trades and append the ones past the high-water mark.
+        /history returns the newest trades (lastTime pages *backwards*), so only when the
+        newest page doesn't reach back to the mark are older pages requested with lastTime.
+        """
+        hwm = self.data_handler.get_trade_high_water_mark(symbol)
+
+        trade_data = self._fetch(self.exchange.get_trade_history, symbol)
+        if not trade_data:
+            return False
+        history = list(trade_data.get("history", []))
+
+        page = history
+        for _ in range(self.max_backfill_pages if hwm is not None else 0):
+            if not page:
+                break
+            oldest = min(t["time"] for t in page)
+            if datetime.fromisoformat(oldest.replace("Z", "+00:00")) <= hwm:
+                break
+            older = self._fetch(self.exchange.get_trade_history, symbol, last_time=oldest)
+            page = older.get("history", []) if older else []
+            history.extend(page)
+
+        return self.data_handler.append_trade_history(symbol, {"history": history}) is not None
+
+    def refresh(self, symbols, order_books=True, trades=True):
+        """
+        Run one refresh cycle over all symbols.
+        Returns cycle stats: {"symbols", "ok", "failed", "wall_time"}
+        """
+        start = time.perf_counter()
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="refresh") as pool:
+            futures = {
+                pool.submit(self._refresh_symbol, symbol, order_books, trades): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    if not future.result():
+                        failed.append(symbol)
+                except Exception as e:
+                    self.logger.warning(f"Failed to refresh order book and trades for {symbol}: {e}")
+                    failed.append(symbol)
+
+        wall_time = time.perf_counter() - start
+        self.last_cycle = {
+            "symbols": len(futures),
+            "ok": len(futures) - len(failed),
+            "failed": failed,
+            "wall_time": wall_time,
+        }
+        self.logger.info(
+            f"Refresh cycle: {self.last_cycle['ok']}/{self.last_cycle['symbols']} symbols in {wall_time:.2f}s"
+        )
+        return self.last_cycle
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import aiohttp
+from exchange.exchange_wrapper import BaseExchangeWrapper, RETRY_STATUSES
+from exchange.rate_limiter import RateLimiter
+from config.settings import (
+    HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+    REFRESH_MAX_IN_FLIGHT
+)
+
+
+class AsyncExchangeWrapper(BaseExchangeWrapper):
+    """
+    asyncio variant of ExchangeWrapper (Kraken Futures REST only, no ccxt).
+    Same request builders, transport is a pooled aiohttp session with aiodns resolution.
+
+    Usage:
+        async with AsyncExchangeWrapper(log) as ex:
+            books = await ex.gather(ex.get_order_book, symbols)
+    """
+
+    def __init__(self, logger, pool_size=HTTP_POOL_SIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR, rate_limiter=None,
+                 recorder=None):
+        self.logger = logger
+        self.rate_limiter = rate_limiter or RateLimiter(logger)  # share with ExchangeWrapper when both run
+        self.recorder = recorder  # optional ResponseRecorder (exchange/recorder.py)
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # session has to be created inside a running loop
+        self.session = None
+        self._stats = {"requests": 0, "new_connections": 0}
+
+        self.logger.info("Initialized AsyncExchangeWrapper")
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self):
+        if self.session is None or self.session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_request_end.append(self._on_request_end)
+            trace.on_connection_create_end.append(self._on_connection_create_end)
+
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                ttl_dns_cache=300,
+                resolver=aiohttp.AsyncResolver(),  # aiodns
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, trace_configs=[trace]
+            )
+        return self.session
+
+    async def _on_request_end(self, session, ctx, params):
+        self._stats["requests"] += 1
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        self._stats["new_connections"] += 1
+
+    def connection_stats(self):
+        """Requests sent vs. new connections opened, same shape as ExchangeWrapper.connection_stats."""
+        sent = self._stats["requests"]
+        handshakes = self._stats["new_connections"]
+        return {
+            self.BASE_URL: {
+                "requests": sent,
+                "new_connections": handshakes,
+                "reused": max(sent - handshakes, 0),
+                "reuse_ratio": (sent - handshakes) / sent if sent else 0.0,
+            }
+        }
+
+    async def close(self):
+        """Release pooled connections."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def _public_get(self, request):
+        """GET a public endpoint built by one of the request builders (retries on 429/5xx)."""
+        if request is None:
+            return None
+        endpoint, params, failure = request
+        session = await self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.rate_limiter.acquire_async(endpoint)
+                async with session.get(endpoint, params=params) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                        await asyncio.sleep(self._retry_delay(attempt, response.headers.get("Retry-After")))
+                        continue
+                    if self.recorder is not None:
+                        body = await response.read()
+                        self.recorder.record(self._record_path(endpoint), params, body, response.status)
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+                    continue
+                self.logger.exception(f"{failure}: {e}")
+                return None
+            except Exception as e:
+                self.logger.exception(f"{failure}: {e}")
+                return None
+
+    async def private_request(self, endpoint_path, params=None, method="POST"):
+        """
+        Send private request to Kraken Futures API (sandbox or live). Never retried.
+
+        :param endpoint_path: API endpoint after /derivatives (/api/v3/____)'
+        :param params: dict of parameters to send
+        :param method: "POST" or "GET"
+        """
+        await self.rate_limiter.acquire_async(endpoint_path)
+        url, post_data, headers = self._private_request_parts(endpoint_path, params, method)
+        session = await self._get_session()
+
+        if method.upper() == "POST":
+            request = session.post(url, headers=headers, data=post_data)
+        else:
+            full_url = f"{url}?{post_data}" if post_data else url
+            request = session.get(full_url, headers=headers)
+
+        async with request as response:
+            body = await response.read()
+            if self.recorder is not None:
+                self.recorder.record(self._record_path(endpoint_path), params, body, response.status, kind="private")
+            if response.status == 200:
+                return json.loads(body)
+            self.logger.error(f"Request failed [{response.status}]: {body.decode(errors='replace')}")
+            response.raise_for_status()
+
+    async def gather(self, method, symbols, max_concurrency=REFRESH_MAX_IN_FLIGHT, **kwargs):
+        """
+        Run one per-symbol method over many symbols concurrently.
+        e.g. await ex.gather(ex.get_order_book, symbols) -> {symbol: response or None}
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(symbol):
+            async with semaphore:
+                return await method(symbol, **kwargs)
+
+        results = await asyncio.gather(*(run(s) for s in symbols), return_exceptions=True)
+
+        out = {}
+        for symbol, res in zip(symbols, results):
+            if isinstance(res, Exception):
+                self.logger.warning(f"Batch call {method.__name__} failed for {symbol}: {res}")
+                res = None
+            out[symbol] = res
+        return out
+
+    # -----------------------
+    # Kraken Futures–specific REST calls
+    # -----------------------
+
+    async def get_trade_history(self, symbol, last_time=None):
+        """Completed trades for a symbol (useful for backtests, slippage models)."""
+        return await self._public_get(self._trade_history_request(symbol, last_time))
+
+    async def get_order_book(self, symbol):
+        """Full snapshot of bids/asks (depth, imbalance, liquidity)."""
+        return await self._public_get(self._order_book_request(symbol))
+
+    async def get_ticker_list(self, contract_type=None):
+        """Market data for ALL contracts + indices (broad monitoring)."""
+        return await self._public_get(self._ticker_list_request(contract_type))
+
+    async def get_ticker(self, symbol):
+        """Market data for a single contract/index (lighter request)."""
+        res = await self._public_get(self._ticker_request(symbol))
+        self._log_ticker(res)
+        return res
+
+    async def get_instruments(self, contract_type=None):
+        """Static metadata about all contracts (tick size, expiry, leverage)."""
+        return await self._public_get(self._instruments_request(contract_type))
+
+    async def get_instrument_status_list(self, contract_type=None):
+        """Market health for all instruments (halts, dislocations, volatility flags)."""
+        return await self._public_get(self._instrument_status_list_request(contract_type))
+
+    async def get_instrument_status(self, symbol):
+        """Market health for one instrument (lighter request)."""
+        return await self._public_get(self._instrument_status_request(symbol))
@@ -3,8 +3,20 @@ import requests
 import base64
 import hashlib
 import hmac
+import threading
 import time
-from config.settings import KRAKEN_API_KEY, KRAKEN_API_SECRET, EXCHANGE
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from exchange.rate_limiter import RateLimiter
+from utils.metrics import METRICS
+from config.settings import (
+    KRAKEN_API_KEY, KRAKEN_API_SECRET, EXCHANGE,
+    HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR
+)
+
+
+# responses worth retrying (rate limited / transient server errors); each attempt goes through the RateLimiter
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 
 # kraken derivatives (sandbox) api docs: https://docs.kraken.com/api/docs/futures-api/trading/market-data
@@ -13,30 +25,34 @@ from config.settings import KRAKEN_API_KEY, KRAKEN_API_SECRET, EXCHANGE
 # need to create a custom function to generate auth strings
 
 
-class ExchangeWrapper:
-    """Unified exchange wrapper for Kraken Futures (and others via ccxt)."""
+class BaseExchangeWrapper:
+    """
+    Request building shared by ExchangeWrapper (requests) and AsyncExchangeWrapper (aiohttp).
+    Each builder returns (endpoint, params, failure message) or None if the call is invalid;
+    the subclasses only own the transport.
+    """
 
     # BASE_URL = "https://demo-futures.kraken.com/derivatives"  # Market Data API root
     BASE_URL = "https://futures.kraken.com/derivatives"  # Market Data API root
 
-# /api/v3/orderbook
-    def __init__(self, logger, exchange_name=EXCHANGE):
-        self.exchange_name = exchange_name
-        self.exchange = self._init_exchange()
-        self.logger = logger
-        self.logger.info(f"Initialized ExchangeWrapper for exchange {self.exchange_name}")
-
-    def _init_exchange(self):
-        exchange_class = getattr(ccxt, self.exchange_name)
-        return exchange_class({
-            "apiKey": KRAKEN_API_KEY,
-            "secret": KRAKEN_API_SECRET,
-            "enableRateLimit": True,
-        })
-    
+    _nonce_lock = threading.Lock()
 
     # custom helper for demo-kraken (paper trading only)
 
+    def _signing_key(self):
+        """HMAC-SHA512 keyed with the decoded API secret. Decoded once, copied per request."""
+        key = getattr(self, "_hmac_key", None)
+        if key is None:
+            key = self._hmac_key = hmac.new(base64.b64decode(KRAKEN_API_SECRET or ""), digestmod=hashlib.sha512)
+        return key
+
+    def _next_nonce(self):
+        """Millisecond nonce, strictly increasing even for several requests in the same millisecond."""
+        with self._nonce_lock:
+            nonce = max(int(time.time() * 1000), getattr(self, "_last_nonce", 0) + 1)
+            self._last_nonce = nonce
+        return str(nonce)
+
     def _get_authent(self, post_data, nonce, endpoint_path):
         """
         Generate Kraken Futures 'Authent' header for private endpoints.
@@ -44,24 +60,16 @@ class ExchangeWrapper:
         """
         message = post_data + nonce + endpoint_path
         sha256_hash = hashlib.sha256(message.encode("utf-8")).digest()
-        secret_bytes = base64.b64decode(KRAKEN_API_SECRET)
-        hmac512 = hmac.new(secret_bytes, sha256_hash, hashlib.sha512).digest()
-        print(f"Message: {message}, Sha256: {sha256_hash} Secret_bytes: {secret_bytes} Hmac: {hmac512}")
-        return base64.b64encode(hmac512).decode()
-
-    # private request wrapper
-    def private_request(self, endpoint_path, params=None, method="POST"):
-        """
-        Send private request to Kraken Futures API (sandbox or live).
+        hmac512 = self._signing_key().copy()
+        hmac512.update(sha256_hash)
+        return base64.b64encode(hmac512.digest()).decode()
 
-        :param endpoint_path: API endpoint after /derivatives (/api/v3/____)'
-        :param params: dict of parameters to send
-        :param method: "POST" or "GET"
-        """
+    def _private_request_parts(self, endpoint_path, params, method):
+        """Sign a private request; returns (url, post_data, headers)."""
         if params is None:
             params = {}
 
-        nonce = str(int(time.time() * 1000))
+        nonce = self._next_nonce()
         post_data = "&".join(f"{k}={v}" for k, v in params.items()) if params else ""
         authent = self._get_authent(post_data, nonce, endpoint_path)
 
@@ -74,17 +82,218 @@ class ExchangeWrapper:
             "Content-Type": "application/x-www-form-urlencoded"
         }
 
-        self.logger.info(f"Request {method} {url} with params: {params}")
-        self.logger.info(f"Authent: {authent}")
+        self.logger.debug(f"Request {method} {url} with params: {params}")
+
+        return url, post_data, headers
+
+    def _contract_type_params(self, contract_type, label):
+        """contractType filter shared by /instruments and /instruments/status."""
+        if not contract_type:
+            self.logger.info(f"Fetching {label} for all contract types")
+            return None
+        if isinstance(contract_type, str):
+            self.logger.info(f"Fetching {label} of type {contract_type}")
+            return {"contractType": contract_type}
+        if isinstance(contract_type, (list, tuple)):
+            self.logger.info(f"Fetching {label} for contract types {', '.join(contract_type)}")
+            return [("contractType", ct) for ct in contract_type]
+        raise ValueError("contract_type must be str, list or tuple")
+
+    # -----------------------
+    # Kraken Futures–specific request builders
+    # -----------------------
+
+    def _trade_history_request(self, symbol, last_time=None):
+        endpoint = f"{self.BASE_URL}/history"
+        if last_time:
+            params = {"symbol": symbol, "lastTime": last_time}
+            self.logger.debug(f"Fetching trade history for {symbol} since {last_time}")
+        else:
+            params = {"symbol": symbol}
+            self.logger.debug(f"Fetching trade history for {symbol}")
+        return endpoint, params, f"Failed to fetch trade history for {symbol}"
 
-        
+    def _order_book_request(self, symbol):
+        if not symbol:
+            self.logger.error("symbol parameter is required for get_order_book")
+            return None
+        self.logger.debug(f"Fetching orderbook for {symbol}")
+        return f"{self.BASE_URL}/orderbook", {"symbol": symbol}, f"Failed to fetch orderbook for {symbol}"
+
+    def _ticker_list_request(self, contract_type=None):
+        endpoint = f"{self.BASE_URL}/tickers"
+        if contract_type:
+            params = {"contractType": contract_type}
+            self.logger.info(f"Fetching market data for contract type {contract_type}")
+        else:
+            params = None
+            self.logger.info(f"Fetching market data for all contract types")
+        return endpoint, params, "Failed to fetch market data"
+
+    def _ticker_request(self, symbol):
+        if not symbol:
+            self.logger.error("symbol parameter is required for get_ticker")
+            return None
+        self.logger.debug(f"Fetching market data for symbol {symbol}")
+        return f"{self.BASE_URL}/tickers/{symbol}", None, f"Failed to fetch market data for {symbol}"
+
+    def _instruments_request(self, contract_type=None):
+        params = self._contract_type_params(contract_type, "instruments")
+        return f"{self.BASE_URL}/instruments", params, "Failed to fetch instruments"
+
+    def _instrument_status_list_request(self, contract_type=None):
+        params = self._contract_type_params(contract_type, "status of instruments")
+        return f"{self.BASE_URL}/instruments/status", params, "Failed to fetch instrument status"
+
+    def _instrument_status_request(self, symbol):
+        if not symbol:
+            self.logger.error("symbol parameter is required for get_instrument_status")
+            return None
+        self.logger.debug(f"Fetching status of instrument with symbol {symbol}")
+        return f"{self.BASE_URL}/instruments/{symbol}/status", None, f"Failed to fetch instrument status for {symbol}"
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """Exponential backoff, or the server's Retry-After (seconds) when that is longer."""
+        delay = self.backoff_factor * (2 ** attempt)
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay  # HTTP-date form
+
+    def _record_path(self, endpoint):
+        """Endpoint relative to BASE_URL, as stored in a response log."""
+        return endpoint[len(self.BASE_URL):] if endpoint.startswith(self.BASE_URL) else endpoint
+
+    def _log_ticker(self, res):
+        if res and "ticker" in res:
+            self.logger.debug(f"Ticker with timestamp: {res['ticker'].get('lastTime')}")
+
+
+class ExchangeWrapper(BaseExchangeWrapper):
+    """Unified exchange wrapper for Kraken Futures (and others via ccxt)."""
+
+# /api/v3/orderbook
+    def __init__(self, logger, exchange_name=EXCHANGE, pool_size=HTTP_POOL_SIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR, rate_limiter=None,
+                 recorder=None):
+        self.exchange_name = exchange_name
+        self.exchange = self._init_exchange()
+        self.logger = logger
+
+        # custom REST calls bypass ccxt's enableRateLimit; pass one RateLimiter to every wrapper in the process
+        self.rate_limiter = rate_limiter or RateLimiter(logger)
+
+        # exchange/recorder.py ResponseRecorder: every raw response is appended for offline replay
+        self.recorder = recorder
+
+        # one keep-alive session shared by public endpoints and private_request
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session = self._init_session(pool_size, max_retries, backoff_factor)
+
+        self.logger.info(f"Initialized ExchangeWrapper for exchange {self.exchange_name}")
+
+    def _init_exchange(self):
+        exchange_class = getattr(ccxt, self.exchange_name)
+        return exchange_class({
+            "apiKey": KRAKEN_API_KEY,
+            "secret": KRAKEN_API_SECRET,
+            "enableRateLimit": True,
+        })
+    
+
+    def _init_session(self, pool_size, max_retries, backoff_factor):
+        """
+        Pooled keep-alive session. urllib3 only retries failed connects (nothing reached the
+        exchange); 429/5xx retries happen in _public_get so each attempt takes rate limiter tokens,
+        and orders sent through private_request are never resent.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=0,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def connection_stats(self):
+        """
+        Connection reuse per host: requests sent vs. new connections opened (TCP+TLS handshakes).
+        """
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                requests_sent = pool.num_requests
+                handshakes = pool.num_connections
+                stats[host] = {
+                    "requests": requests_sent,
+                    "new_connections": handshakes,
+                    "reused": max(requests_sent - handshakes, 0),
+                    "reuse_ratio": (requests_sent - handshakes) / requests_sent if requests_sent else 0.0,
+                }
+        return stats
+
+    def close(self):
+        """Release pooled connections."""
+        self.session.close()
+
+    def _public_get(self, request):
+        """GET a public endpoint built by one of the request builders (retries on 429/5xx)."""
+        if request is None:
+            return None
+        endpoint, params, failure = request
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.rate_limiter.acquire(endpoint)
+                with METRICS.timer("exchange_rtt_seconds"):
+                    response = self.session.get(endpoint, params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    break
+                time.sleep(self._retry_delay(attempt, response.headers.get("Retry-After")))
+            if self.recorder is not None:
+                self.recorder.record(self._record_path(endpoint), params, response.content, response.status_code)
+            response.raise_for_status()
+            with METRICS.timer("exchange_json_seconds"):
+                return response.json()
+        except Exception as e:
+            self.logger.exception(f"{failure}: {e}")
+            return None
+
+    # private request wrapper
+    def private_request(self, endpoint_path, params=None, method="POST"):
+        """
+        Send private request to Kraken Futures API (sandbox or live).
+
+        :param endpoint_path: API endpoint after /derivatives (/api/v3/____)'
+        :param params: dict of parameters to send
+        :param method: "POST" or "GET"
+        """
+        self.rate_limiter.acquire(endpoint_path)
+        url, post_data, headers = self._private_request_parts(endpoint_path, params, method)
 
         # POST or GET depending on endpoint
         if method.upper() == "POST":
-            response = requests.post(url, headers=headers, data=post_data)
+            response = self.session.post(url, headers=headers, data=post_data, timeout=self.timeout)
         else:
             full_url = f"{url}?{post_data}" if post_data else url
-            response = requests.get(full_url, headers=headers)
+            response = self.session.get(full_url, headers=headers, timeout=self.timeout)
+
+        if self.recorder is not None:
+            self.recorder.record(endpoint_path, params, response.content, response.status_code, kind="private")
 
         if response.status_code == 200:
             return response.json()
@@ -164,142 +373,34 @@ class ExchangeWrapper:
 
     def get_trade_history(self, symbol, last_time=None):
         """Completed trades for a symbol (useful for backtests, slippage models)."""
-        endpoint = f"{self.BASE_URL}/history"
-        if last_time:
-            params = {"symbol": symbol, "lastTime": last_time}
-            self.logger.info(f"Fetching trade history for {symbol} since {last_time}")
-        else:
-            params = {"symbol": symbol}
-            self.logger.info(f"Fetching trade history for {symbol}")
-
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception(f"Failed to fetch trade history for {symbol}: {e}")
-            return None
+        return self._public_get(self._trade_history_request(symbol, last_time))
 
     def get_order_book(self, symbol):
         """Full snapshot of bids/asks (depth, imbalance, liquidity)."""
-        if not symbol:
-            self.logger.error("symbol parameter is required for get_order_book")
-            return None
-        endpoint = f"{self.BASE_URL}/orderbook"
-        params = {"symbol": symbol}
-        self.logger.info(f"Fetching orderbook for {symbol}")
-
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception(f"Failed to fetch orderbook for {symbol}: {e}")
-            return None
+        return self._public_get(self._order_book_request(symbol))
 
     def get_ticker_list(self, contract_type=None):
         """Market data for ALL contracts + indices (broad monitoring)."""
-        endpoint = f"{self.BASE_URL}/tickers"
-        if contract_type: 
-            params = {"contractType": contract_type}
-            self.logger.info(f"Fetching market data for contract type {contract_type}")
-        else:
-            params = None
-            self.logger.info(f"Fetching market data for all contract types")
+        return self._public_get(self._ticker_list_request(contract_type))
 
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception("Failed to fetch market data")
-            return None
-
-# ----------------------------------------
     def get_ticker(self, symbol):
         """Market data for a single contract/index (lighter request)."""
-        if symbol:
-            endpoint = f"{self.BASE_URL}/tickers/{symbol}"
-            self.logger.info(f"Fetching market data for symbol {symbol}")
-        else:
-            self.logger.error("symbol parameter is required for get_ticker")
-
-        try:
-            response = requests.get(endpoint)
-            response.raise_for_status()
-            res = response.json()
-            self.logger.info(f"Ticker with timestamp: {res['ticker'].get("lastTime")}")
-            return res
-            return response.json()
-        except Exception as e:
-            self.logger.exception("Failed to fetch market data")
-            return None
-
+        res = self._public_get(self._ticker_request(symbol))
+        self._log_ticker(res)
+        return res
 
     def get_instruments(self, contract_type=None):
         """Static metadata about all contracts (tick size, expiry, leverage)."""
-        endpoint = f"{self.BASE_URL}/instruments"
-
-        params = None
-        if contract_type:
-            if isinstance(contract_type, str):
-                params = {"contractType": contract_type}
-                self.logger.info(f"Fetching instruments of type {contract_type}")
-            elif isinstance(contract_type, (list, tuple)):
-                params = [("contractType", ct) for ct in contract_type]
-                self.logger.info(f"Fetching instruments for contract types {', '.join(contract_type)}")
-            else:
-                raise ValueError("contract_type must be str, list or tuple")
-        else:
-            self.logger.info("Fetching instruments for all contract types")
+        return self._public_get(self._instruments_request(contract_type))
 
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception("Failed to fetch instruments")
-            return None
-
-    def get_instrument_status_list(self, contract_type = None):
+    def get_instrument_status_list(self, contract_type=None):
         """Market health for all instruments (halts, dislocations, volatility flags)."""
-        endpoint = f"{self.BASE_URL}/instruments/status"
-
-        params = None
-        if contract_type:
-            if isinstance(contract_type, str):
-                params = {"contractType": contract_type}
-                self.logger.info(f"Fetching status of instruments of type {contract_type}")
-            elif isinstance(contract_type, (list, tuple)):
-                params = [("contractType", ct) for ct in contract_type]
-                self.logger.info(f"Fetching status of instruments for contract types {', '.join(contract_type)}")
-            else:
-                raise ValueError("contract_type must be str, list or tuple")
-        else:
-            self.logger.info("Fetching status of instruments for all contract types")
-
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception("Failed to fetch instrument status")
-            return None
-        
+        return self._public_get(self._instrument_status_list_request(contract_type))
 
     def get_instrument_status(self, symbol):
         """Market health for one instrument (lighter request)."""
+        return self._public_get(self._instrument_status_request(symbol))
 
-        if symbol:
-            endpoint = f"{self.BASE_URL}/instruments/{symbol}/status"
-            self.logger.info(f"Fetching status of instrument with symbol {symbol}")
-        else:
-            self.logger.error("symbol parameter is required for get_ticker")
 
-        try:
-            response = requests.get(endpoint)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            self.logger.exception(f"Failed to fetch instrument status: {e}")
-            return None
\ No newline at end of file
+# per-method call time (rate-limit wait + RTT + JSON parse)
+METRICS.instrument(ExchangeWrapper, "exchange_call_seconds", methods=("private_request",), prefixes=("get_",))
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+
+import aiohttp
+from data.order_book import L2Book
+from config.settings import WS_URL, WS_HEARTBEAT_TIMEOUT, WS_MAX_BACKOFF
+
+
+# kraken futures websocket docs: https://docs.kraken.com/api/docs/futures-api/websocket/ticker
+
+# websocket ticker fields -> REST /tickers fields, so consumers (DataHandler, Trader) see one shape
+TICKER_FIELDS = {
+    "product_id": "symbol",
+    "last": "last",
+    "bid": "bid",
+    "bid_size": "bidSize",
+    "ask": "ask",
+    "ask_size": "askSize",
+    "markPrice": "markPrice",
+    "index": "indexPrice",
+    "volume": "vol24h",
+    "volumeQuote": "volumeQuote",
+    "openInterest": "openInterest",
+    "open": "open24h",
+    "high": "high24h",
+    "low": "low24h",
+    "change": "change24h",
+    "funding_rate": "fundingRate",
+    "funding_rate_prediction": "fundingRatePrediction",
+    "suspended": "suspended",
+    "post_only": "postOnly",
+    "tag": "tag",
+    "pair": "pair",
+}
+
+
+def _ms_to_iso(ms):
+    """Epoch millis -> REST-style ISO timestamp (2025-09-03T12:57:21.314Z)."""
+    if ms is None:
+        return None
+    ts = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ts.microsecond // 1000:03d}Z"
+
+
+class MarketDataStream:
+    """
+    Streams Kraken Futures ticker, book and trade feeds into in-memory state.
+
+    Books are kept as L2Book (self.books, symbol -> L2Book) for depth queries; tickers and trades
+    in the shape the REST wrapper returns, so they can be handed straight to DataHandler and Trader.
+    Reconnects with backoff, resubscribes on connect, and resnapshots a book on a seq gap.
+
+    Listeners registered with add_listener(feed, fn) are called as fn(symbol, payload) on the
+    stream thread, so they should only hand data off (e.g. to a queue.Queue).
+    """
+
+    FEEDS = ("ticker", "book", "trade")
+
+    def __init__(self, logger, symbols, feeds=FEEDS, url=WS_URL,
+                 heartbeat_timeout=WS_HEARTBEAT_TIMEOUT, max_backoff=WS_MAX_BACKOFF, max_trades=1000):
+        self.logger = logger
+        self.symbols = list(symbols)
+        self.feeds = tuple(feeds)
+        self.url = url
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_backoff = max_backoff
+
+        # in-memory state
+        self.tickers = {}
+        self.books = {}     # symbol -> L2Book
+        self.trades = defaultdict(lambda: deque(maxlen=max_trades))
+        self._book_seq = {}
+        self._state_lock = threading.Lock()
+
+        self._listeners = defaultdict(list)
+        self._ws = None
+        self._loop = None
+        self._thread = None
+        self._stop = None
+        self.reconnects = 0
+
+        self.logger.info(f"Initialized MarketDataStream for {len(self.symbols)} symbol(s), feeds: {', '.join(self.feeds)}")
+
+    def add_listener(self, feed, callback):
+        """callback(symbol, payload) for feed in ticker/book/trade."""
+        self._listeners[feed].append(callback)
+
+    def _emit(self, feed, symbol, payload):
+        for callback in self._listeners[feed]:
+            try:
+                callback(symbol, payload)
+            except Exception as e:
+                self.logger.exception(f"Stream listener for {feed} failed: {e}")
+
+    # -----------------------
+    # Connection lifecycle
+    # -----------------------
+
+    async def run(self):
+        """Connect, subscribe and consume until stop() is called; reconnects on any drop."""
+        self._stop = asyncio.Event()
+        backoff = 1.0
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                try:
+                    async with session.ws_connect(self.url, heartbeat=self.heartbeat_timeout) as ws:
+                        self._ws = ws
+                        self.logger.info(f"Connected to {self.url}")
+                        await self._subscribe_all()
+                        backoff = 1.0
+                        await self._consume(ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    self.logger.warning(f"WebSocket connection lost: {e}")
+                finally:
+                    self._ws = None
+
+                if self._stop.is_set():
+                    break
+
+                self.reconnects += 1
+                self.logger.info(f"Reconnecting in {backoff:.1f}s (attempt {self.reconnects})")
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, self.max_backoff)
+
+        self.logger.info("MarketDataStream stopped")
+
+    async def _consume(self, ws):
+        while not self._stop.is_set():
+            try:
+                msg = await ws.receive(timeout=self.heartbeat_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"No market data for {self.heartbeat_timeout}s, reconnecting")
+                return
+
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                await self._handle(json.loads(msg.data))
+            elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                              aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                self.logger.warning(f"WebSocket closed by server ({msg.type.name})")
+                return
+
+    async def _send(self, event, feed, product_ids=None):
+        if self._ws is None or self._ws.closed:
+            return
+        message = {"event": event, "feed": feed}
+        if product_ids:
+            message["product_ids"] = list(product_ids)
+        await self._ws.send_str(json.dumps(message))
+
+    async def _subscribe_all(self):
+        # fresh connection -> books come back as snapshots
+        with self._state_lock:
+            self.books.clear()
+            self._book_seq.clear()
+
+        await self._send("subscribe", "heartbeat")
+        for feed in self.feeds:
+            await self._send("subscribe", feed, self.symbols)
+
+    async def _resubscribe_book(self, symbol):
+        self.logger.warning(f"Book sequence gap for {symbol}, requesting new snapshot")
+        with self._state_lock:
+            self.books.pop(symbol, None)
+            self._book_seq.pop(symbol, None)
+        await self._send("unsubscribe", "book", [symbol])
+        await self._send("subscribe", "book", [symbol])
+
+    def start(self):
+        """Run the stream on its own event loop in a daemon thread."""
+        def _target():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.run())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_target, name="market-stream", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        """Signal the stream to stop and wait for the thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._ws is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # -----------------------
+    # Message handling
+    # -----------------------
+
+    async def _handle(self, msg):
+        feed = msg.get("feed")
+        event = msg.get("event")
+
+        if event:
+            if event == "error" or event == "alert":
+                self.logger.error(f"WebSocket {event}: {msg.get('message')}")
+            elif event in ("subscribed", "unsubscribed"):
+                self.logger.debug(f"{event} {msg.get('feed')} {msg.get('product_ids', '')}")
+            return
+
+        if feed == "ticker":
+            self._on_ticker(msg)
+        elif feed == "book_snapshot":
+            self._on_book_snapshot(msg)
+        elif feed == "book":
+            await self._on_book_delta(msg)
+        elif feed == "trade_snapshot":
+            for trade in reversed(msg.get("trades", [])):
+                self._on_trade(trade)
+        elif feed == "trade":
+            self._on_trade(msg)
+
+    def _on_ticker(self, msg):
+        ticker = {rest_key: msg[ws_key] for ws_key, rest_key in TICKER_FIELDS.items() if ws_key in msg}
+        ticker["lastTime"] = _ms_to_iso(msg.get("time"))
+        symbol = ticker.get("symbol")
+
+        with self._state_lock:
+            self.tickers[symbol] = ticker
+        self._emit("ticker", symbol, ticker)
+
+    def _on_book_snapshot(self, msg):
+        symbol = msg.get("product_id")
+        with self._state_lock:
+            book = self.books.get(symbol) or L2Book(symbol)
+            book.apply_snapshot(msg.get("bids", []), msg.get("asks", []), msg.get("seq"))
+            self.books[symbol] = book
+            self._book_seq[symbol] = msg.get("seq")
+        self._emit("book", symbol, book)
+
+    async def _on_book_delta(self, msg):
+        symbol = msg.get("product_id")
+        seq = msg.get("seq")
+        last_seq = self._book_seq.get(symbol)
+
+        if last_seq is None:
+            return  # no snapshot yet
+        if seq is not None and seq != last_seq + 1:
+            await self._resubscribe_book(symbol)
+            return
+
+        with self._state_lock:
+            book = self.books[symbol]
+            book.apply_delta(msg.get("side"), msg["price"], msg.get("qty", 0), seq)
+            self._book_seq[symbol] = seq
+        self._emit("book", symbol, book)
+
+    def _on_trade(self, msg):
+        symbol = msg.get("product_id")
+        trade = {
+            "time": _ms_to_iso(msg.get("time")),
+            "trade_id": msg.get("seq"),
+            "uid": msg.get("uid"),
+            "price": msg.get("price"),
+            "size": msg.get("qty"),
+            "side": msg.get("side"),
+            "type": msg.get("type"),
+        }
+        with self._state_lock:
+            self.trades[symbol].append(trade)
+        self._emit("trade", symbol, trade)
+
+    # -----------------------
+    # Snapshots (REST-shaped)
+    # -----------------------
+
+    def get_ticker(self, symbol):
+        """Latest ticker, shaped like ExchangeWrapper.get_ticker."""
+        with self._state_lock:
+            ticker = self.tickers.get(symbol)
+            return {"ticker": dict(ticker)} if ticker else None
+
+    @property
+    def state_lock(self):
+        """Held while books/tickers/trades are updated; hold it to read an L2Book in place."""
+        return self._state_lock
+
+    def get_order_book(self, symbol, depth=None):
+        """Current book, shaped like ExchangeWrapper.get_order_book."""
+        with self._state_lock:
+            book = self.books.get(symbol)
+            return book.to_dict(depth) if book else None
+
+    def drain_trades(self, symbol):
+        """Trades received since the last drain, shaped like ExchangeWrapper.get_trade_history."""
+        with self._state_lock:
+            trades = list(self.trades[symbol])
+            self.trades[symbol].clear()
+        return {"history": trades}
@@ -0,0 +1,151 @@
+import json
+import time
+from collections import deque
+from urllib.parse import urlencode
+
+import numpy as np
+
+from config.settings import KRAKEN_API_KEY, ORDER_LATENCY_SAMPLES
+from utils.metrics import METRICS
+
+
+class OrderEntry:
+    """
+    Order entry for Kraken Futures (sendorder / cancelorder / batchorder).
+
+    Sends on the ExchangeWrapper's keep-alive session (never retried) through the rate limiter's
+    order lane. URL, signing path and static headers are fixed per endpoint up front and the HMAC key
+    is decoded once, so per order only the body, nonce and Authent are built. Every acknowledged
+    request records signal-to-ack latency.
+    """
+
+    ENDPOINTS = {
+        "sendorder": "/api/v3/sendorder",
+        "cancelorder": "/api/v3/cancelorder",
+        "batchorder": "/api/v3/batchorder",
+    }
+
+    def __init__(self, exchange_wrapper, logger, samples=ORDER_LATENCY_SAMPLES, rate_limiter=None):
+        self.exchange = exchange_wrapper
+        self.logger = logger
+        self.rate_limiter = rate_limiter or exchange_wrapper.rate_limiter  # the process-wide RateLimiter
+        self.session = exchange_wrapper.session
+        self.timeout = exchange_wrapper.timeout
+
+        # endpoint -> (signing path, url, static headers)
+        headers = {"APIKey": KRAKEN_API_KEY, "Content-Type": "application/x-www-form-urlencoded"}
+        self.templates = {
+            name: (path, f"{exchange_wrapper.BASE_URL}{path}", headers)
+            for name, path in self.ENDPOINTS.items()
+        }
+
+        # (endpoint, signal -> ack seconds, send -> ack seconds)
+        self.latencies = deque(maxlen=samples)
+
+        # decode the secret now rather than on the first order
+        self.exchange._signing_key()
+        self.logger.info("Initialized OrderEntry")
+
+    def warm_up(self):
+        """Open the connection (DNS + TCP + TLS) ahead of the first order."""
+        try:
+            self.session.head(self.exchange.BASE_URL, timeout=self.timeout)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Order entry warm-up failed: {e}")
+            return False
+
+    # -----------------------
+    # Requests
+    # -----------------------
+
+    def _send(self, name, post_data, signal_time=None, cost=None):
+        """
+        Sign and POST one request from its template; returns the JSON response or None.
+        post_data is the URL-encoded body: the exact string that is signed is the one sent.
+        """
+        path, url, headers = self.templates[name]
+        self.rate_limiter.acquire(path, lane="order", cost=cost)
+        nonce = self.exchange._next_nonce()
+        headers = {**headers, "Nonce": nonce, "Authent": self.exchange._get_authent(post_data, nonce, path)}
+
+        sent = time.perf_counter()
+        try:
+            response = self.session.post(url, headers=headers, data=post_data, timeout=self.timeout)
+            acked = time.perf_counter()
+            if response.status_code != 200:
+                self.logger.error(f"{name} failed [{response.status_code}]: {response.text}")
+                return None
+            result = response.json()
+        except Exception as e:
+            self.logger.error(f"{name} failed: {e}")
+            return None
+
+        total = acked - (sent if signal_time is None else signal_time)
+        self.latencies.append((name, total, acked - sent))
+        METRICS.observe("order_signal_to_ack_seconds", total, endpoint=name)
+        METRICS.observe("order_send_to_ack_seconds", acked - sent, endpoint=name)
+        if result.get("result") != "success":
+            self.logger.error(f"{name} rejected: {result.get('error')}")
+        return result
+
+    def send_order(self, symbol, side, size, order_type="mkt", limit_price=None, cli_ord_id=None,
+                   reduce_only=False, signal_time=None):
+        """
+        Place one order. signal_time (time.perf_counter() when the signal fired) is the start of
+        the latency sample; defaults to the moment the request is sent.
+        """
+        params = {"orderType": order_type, "symbol": symbol, "side": side, "size": size}
+        if limit_price is not None:
+            params["limitPrice"] = limit_price
+        if cli_ord_id is not None:
+            params["cliOrdId"] = cli_ord_id
+        if reduce_only:
+            params["reduceOnly"] = "true"
+
+        self.logger.info(f"Sending {order_type} {side} {size} {symbol}")
+        return self._send("sendorder", urlencode(params), signal_time)
+
+    def cancel_order(self, order_id=None, cli_ord_id=None, signal_time=None):
+        """Cancel by exchange order_id or by cliOrdId."""
+        if order_id is not None:
+            post_data = urlencode({"order_id": order_id})
+        elif cli_ord_id is not None:
+            post_data = urlencode({"cliOrdId": cli_ord_id})
+        else:
+            self.logger.error("order_id or cli_ord_id is required for cancel_order")
+            return None
+
+        self.logger.info(f"Cancelling order {order_id or cli_ord_id}")
+        return self._send("cancelorder", post_data, signal_time)
+
+    def batch_order(self, instructions, signal_time=None):
+        """
+        Several sends / edits / cancels in one request, e.g.
+        [{"order": "send", "order_tag": "1", "orderType": "lmt", "symbol": "PF_XBTUSD", "side": "buy",
+          "size": 1, "limitPrice": 50000}, {"order": "cancel", "order_id": "..."}]
+        """
+        if not instructions:
+            return None
+        post_data = urlencode({"json": json.dumps({"batchOrder": list(instructions)}, separators=(",", ":"))})
+
+        self.logger.info(f"Sending batch of {len(instructions)} order instruction(s)")
+        cost = self.rate_limiter.classify("batchorder")[1] + len(instructions)
+        return self._send("batchorder", post_data, signal_time, cost)
+
+    # -----------------------
+    # Latency
+    # -----------------------
+
+    def latency_stats(self):
+        """Per endpoint: count and p50/p90/p99/max in ms for signal->ack and send->ack."""
+        stats = {}
+        for name in self.ENDPOINTS:
+            samples = np.array([(total, wire) for n, total, wire in self.latencies if n == name])
+            if not len(samples):
+                continue
+            stats[name] = {"count": len(samples)}
+            for label, column in (("signal_to_ack", samples[:, 0]), ("send_to_ack", samples[:, 1])):
+                p50, p90, p99 = np.percentile(column, [50, 90, 99]) * 1000
+                stats[name][label] = {"p50": p50, "p90": p90, "p99": p99, "max": column.max() * 1000}
+        return stats
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from config.settings import RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL
+
+
+# priority lanes, highest first
+LANES = ("order", "market", "bulk")
+
+# path segment -> (lane, token cost). Order costs follow Kraken Futures' private API pool
+# (500 per 10s, sendorder/cancelorder 10, batchorder 9 + instructions); public calls are weighted
+# so a wide refresh can't saturate the bucket.
+ENDPOINT_RULES = {
+    "sendorder": ("order", 10),
+    "editorder": ("order", 10),
+    "cancelorder": ("order", 10),
+    "cancelallorders": ("order", 25),
+    "batchorder": ("order", 9),
+    "tickers": ("market", 1),
+    "orderbook": ("market", 2),
+    "status": ("market", 1),
+    "history": ("bulk", 5),
+    "instruments": ("bulk", 2),
+}
+DEFAULT_RULE = ("market", 2)
+
+
+class RateLimiter:
+    """
+    Client-side token bucket shared by every REST call (ExchangeWrapper, AsyncExchangeWrapper, OrderEntry).
+
+    Each request costs tokens by endpoint and waits in one of three lanes. A request only proceeds
+    once it heads the highest-priority non-empty lane and the bucket holds its cost, so queued orders
+    and ticker polls always go before history backfills. Lanes are FIFO.
+    """
+
+    def __init__(self, logger, capacity=RATE_LIMIT_CAPACITY, refill_rate=RATE_LIMIT_REFILL, rules=None):
+        self.logger = logger
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.rules = ENDPOINT_RULES if rules is None else rules
+
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._queues = {lane: deque() for lane in LANES}
+        self._stats = {lane: {"requests": 0, "waited": 0, "wait_time": 0.0, "max_wait": 0.0, "max_queued": 0}
+                       for lane in LANES}
+
+        self.logger.info(f"Initialized RateLimiter ({capacity:g} tokens, {refill_rate:g}/s)")
+
+    def classify(self, endpoint):
+        """(lane, cost) for a URL or endpoint path, by its last known path segment."""
+        for segment in reversed(endpoint.split("?", 1)[0].rstrip("/").split("/")):
+            if segment in self.rules:
+                return self.rules[segment]
+        return DEFAULT_RULE
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def _head(self):
+        for lane in LANES:
+            if self._queues[lane]:
+                return self._queues[lane][0]
+        return None
+
+    def acquire(self, endpoint, lane=None, cost=None):
+        """Block until the request may be sent. Returns seconds waited."""
+        rule_lane, rule_cost = self.classify(endpoint)
+        lane = lane or rule_lane
+        cost = min(rule_cost if cost is None else cost, self.capacity)
+
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            queue = self._queues[lane]
+            queue.append(ticket)
+            stats = self._stats[lane]
+            stats["max_queued"] = max(stats["max_queued"], len(queue))
+            try:
+                while True:
+                    self._refill()
+                    if self._head() is ticket:
+                        if self.tokens >= cost:
+                            self.tokens -= cost
+                            break
+                        # head of the line: sleep until the bucket holds our cost (or a higher lane arrives)
+                        self._cond.wait((cost - self.tokens) / self.refill_rate)
+                    else:
+                        self._cond.wait()
+            finally:
+                queue.remove(ticket)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats["requests"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+                stats["wait_time"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+    async def acquire_async(self, endpoint, lane=None, cost=None):
+        """acquire() for the asyncio wrapper; the wait happens off the event loop."""
+        return await asyncio.to_thread(self.acquire, endpoint, lane, cost)
+
+    def stats(self):
+        """Tokens available plus, per lane, current queue depth and request/wait counters."""
+        with self._cond:
+            self._refill()
+            return {
+                "tokens": self.tokens,
+                "lanes": {lane: {"queued": len(self._queues[lane]), **self._stats[lane]} for lane in LANES},
+            }
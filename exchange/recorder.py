@@ -0,0 +1,179 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from config.settings import RECORD_COMPRESS_LEVEL
+
+
+# Response log layout (little-endian, append-only):
+#   file:   MAGIC, then records back to back
+#   record: HEADER (ts_ns int64, status uint16, meta_len uint16, body_len uint32, raw_len uint32)
+#           meta   JSON {"kind", "path", "params"}   (uncompressed, a few hundred bytes at most)
+#           body   zlib-compressed raw response bytes
+# Every record is compressed on its own and written with a single O_APPEND write, so the file
+# is valid after any crash (a torn last record is ignored) and readers can mmap it and walk the
+# headers to a time range without inflating the bodies they skip.
+
+MAGIC = b"KRRLOG1\n"
+HEADER = struct.Struct("<qHHII")
+
+
+class Record:
+    """One recorded response. body is the raw bytes as received; json() parses it."""
+
+    __slots__ = ("ts", "status", "kind", "path", "params", "body")
+
+    def __init__(self, ts, status, kind, path, params, body):
+        self.ts = ts            # receive time, ns since epoch
+        self.status = status
+        self.kind = kind        # "public" | "private"
+        self.path = path        # endpoint after BASE_URL, e.g. /tickers or /orderbook
+        self.params = params
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+    def param(self, name):
+        """Query parameter value (params are stored as a dict or a list of pairs)."""
+        params = self.params or {}
+        if isinstance(params, dict):
+            return params.get(name)
+        return next((v for k, v in params if k == name), None)
+
+
+class ResponseRecorder:
+    """
+    Appends raw exchange responses to a response log (format above). Thread-safe: the refresher's
+    worker threads share one recorder, and each record goes out in one write.
+
+        recorder = ResponseRecorder("capture/2025-09-03.krr", log)
+        exchange = ExchangeWrapper(log, recorder=recorder)
+    """
+
+    def __init__(self, path, logger, level=RECORD_COMPRESS_LEVEL):
+        self.path = path
+        self.logger = logger
+        self.level = level  # zlib level; 1 keeps the cost on the request thread well under a millisecond
+        self.records = 0
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size == 0:
+            os.write(self.fd, MAGIC)
+
+        self.logger.info(f"Recording exchange responses to {path}")
+
+    def record(self, path, params, body, status=200, kind="public", ts=None):
+        """Append one response; never raises (recording must not break the request path)."""
+        try:
+            ts = time.time_ns() if ts is None else ts
+            meta = json.dumps({"kind": kind, "path": path, "params": params}, separators=(",", ":")).encode()
+            data = zlib.compress(body, self.level)
+            frame = HEADER.pack(ts, status, len(meta), len(data), len(body)) + meta + data
+
+            with self._lock:
+                os.write(self.fd, frame)
+                self.records += 1
+                self.raw_bytes += len(body)
+                self.written_bytes += len(frame)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to record response for {path}: {e}")
+            return False
+
+    def stats(self):
+        return {
+            "records": self.records,
+            "raw_bytes": self.raw_bytes,
+            "written_bytes": self.written_bytes,
+            "ratio": self.raw_bytes / self.written_bytes if self.written_bytes else 0.0,
+        }
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ResponseLog:
+    """
+    Memory-mapped reader for a response log. Iterates records in file (= receive) order;
+    records(start, end) skips out-of-range ones on the header alone.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _frames(self, mm):
+        """(offset, ts, status, meta_len, body_len) per complete record."""
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a response log")
+        offset = len(MAGIC)
+        size = len(mm)
+        while offset + HEADER.size <= size:
+            ts, status, meta_len, body_len, _ = HEADER.unpack_from(mm, offset)
+            end = offset + HEADER.size + meta_len + body_len
+            if end > size:
+                break  # torn tail from a crash mid-write
+            yield offset, ts, status, meta_len, body_len
+            offset = end
+
+    def records(self, start=None, end=None, paths=None):
+        """
+        Records with start <= ts < end (ns since epoch, either bound optional), optionally only
+        those whose path is in paths.
+        """
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, ts, status, meta_len, body_len in self._frames(mm):
+                    if (start is not None and ts < start) or (end is not None and ts >= end):
+                        continue
+                    meta_at = offset + HEADER.size
+                    meta = json.loads(mm[meta_at:meta_at + meta_len])
+                    if paths is not None and meta["path"] not in paths:
+                        continue
+                    body = zlib.decompress(mm[meta_at + meta_len:meta_at + meta_len + body_len])
+                    yield Record(ts, status, meta["kind"], meta["path"], meta["params"], body)
+
+    def __iter__(self):
+        return self.records()
+
+    def summary(self):
+        """Record count, time span and sizes, from the headers only."""
+        count, first, last, raw, stored = 0, None, None, 0, 0
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return {"records": 0, "first_ts": None, "last_ts": None, "seconds": 0.0, "raw_bytes": 0, "stored_bytes": 0}
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, ts, status, meta_len, body_len in self._frames(mm):
+                    count += 1
+                    first = ts if first is None else first
+                    last = ts
+                    raw += HEADER.unpack_from(mm, offset)[4]
+                    stored += HEADER.size + meta_len + body_len
+        return {
+            "records": count,
+            "first_ts": first,
+            "last_ts": last,
+            "seconds": (last - first) / 1e9 if count else 0.0,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+        }
@@ -1,10 +1,19 @@
 from exchange.exchange_wrapper import ExchangeWrapper
+from exchange.market_stream import MarketDataStream
+from exchange.recorder import ResponseRecorder
+from exchange.rate_limiter import RateLimiter
 from data.data_handler import DataHandler
+from data.refresher import MarketDataRefresher
 from strategies.moving_average import MovingAverageStrategy
 from trader.trader import Trader
-from config.settings import SYMBOL, TIMEFRAME, DATABASE_URL
+from trader.scanner import UniverseScanner
+from config.settings import (
+    SYMBOL, TIMEFRAME, DATABASE_URL, METRICS_PORT, METRICS_DUMP_PATH, RECORD_PATH, MOMENTUM_RSI_WINDOW
+)
 from utils.logger import Logger
+from utils.metrics import METRICS
 import sys
+import queue
 import pandas as pd
 import time
 
@@ -95,8 +104,7 @@ def initialize_database(data_handler, exchange, log):
 
     log.info("Database initialization completed successfully.")
 
-def live_trading(data_handler, exchange, trader, log):
-    # smarter to concurently call each api or in-line?
+def live_trading(data_handler, exchange, trader, log, refresher=None, candles=None):
     """
     Live trading polling: Refresh only neccecesary data, minmize latency
     1. Instrument status: poll frequently for dislocations / volatility
@@ -114,32 +122,29 @@ def live_trading(data_handler, exchange, trader, log):
     try:
         # all instruments
         status = exchange.get_instrument_status_list()
-        data_handler.save_instrument_status(status)
+        # delta write: only instruments whose status changed (latest_instrument_status + snapshot_changes)
+        data_handler.snapshot_instrument_status(status)
     except Exception as e:
         log.warning(f"Failed to fetch statuses: {e}")
 
 
     # 2. Ticker refresh
     try:
-        # all tickers
+        # all tickers, delta write (latest_tickers + snapshot_changes)
         ticker = exchange.get_ticker_list()
-        data_handler.save_tickers(ticker)
+        data_handler.snapshot_tickers(ticker)
     except Exception as e:
         log.warning(f"Failed to fetch and save tickers: {e}")
 
     # 3/4. Order book + trades refresh
-    # can def optimize; don't loop per instrument
-    for inst in instruments:
-        symbol = inst["symbol"]
-        try:
-            order_book = exchange.get_order_book(symbol)
-            data_handler.save_order_book(symbol, order_book)
+    # fanned out over a bounded pool; see data/refresher.py
+    if refresher is None:
+        refresher = MarketDataRefresher(exchange, data_handler, log)
+    refresher.refresh([inst["symbol"] for inst in instruments])
 
-            trades = exchange.get_trade_history(symbol)
-            data_handler.save_trade_history(symbol, trades)
-        except Exception as e:
-            log.warning(f"Failed to fetch order book and trades for {symbol}: {e}")
-            continue
+    # 5. Candles: roll the trades just written into 1m/5m/1h bars
+    if candles is not None:
+        candles.update()
 
     # expects keys: time, open, high, low, close, volume
 
@@ -150,7 +155,7 @@ def live_trading_test(data_handler, exchange, trader, log):
 
     ohlcv_keys = ["lastTime", "open24h", "high24h", "low24h", "last", "vol24h"]
     df = pd.DataFrame(columns=ohlcv_keys)
-    window_rsi = 14
+    window_rsi = MOMENTUM_RSI_WINDOW
 
     # Fetch a selection of instruments; just get top one for testing
     try:
@@ -197,58 +202,181 @@ def live_trading_test(data_handler, exchange, trader, log):
         log.warning(f"Failed to generate and execute signals for {symbol}: {e}")
 
 
-def strategy_test(data_handler, trader, log):
+def live_trading_stream(data_handler, trader, log, flush_interval=60, candles=None):
+    """
+    Same flow as live_trading_test, but fed by the websocket stream instead of polling get_ticker.
+    Stream listeners only enqueue; DataHandler writes and Trader.momentum_tick run on this thread.
+    """
+    log.info("Starting LT stream...")
+
+    window_rsi = MOMENTUM_RSI_WINDOW
+
+    # Fetch a selection of instruments; just get top one for testing
+    try:
+        symbol = data_handler.get_instruments()[0]["symbol"]
+    except Exception as e:
+        log.warning(f"Failed to establish symbol: {e}")
+        return
+
+    updates = queue.Queue()
+    stream = MarketDataStream(log, [symbol])
+    # receive time travels with the tick: it starts the signal-to-ack latency sample
+    stream.add_listener("ticker", lambda sym, ticker: updates.put((time.perf_counter(), ticker)))
+    stream.start()
+    trader.books = stream.books  # liquidity checks against the live L2 book
+    trader.book_lock = stream.state_lock
+
+    last_timestamp = None
+    last_flush = time.monotonic()
+    try:
+        while True:
+            try:
+                received, ticker_data = updates.get(timeout=1)
+            except queue.Empty:
+                ticker_data = None
+
+            if ticker_data and ticker_data.get("lastTime") != last_timestamp:
+                last_timestamp = ticker_data.get("lastTime")
+                data_handler.append_ticker(ticker_data, symbol)
+
+                # incremental indicators: O(1) per tick, signal evaluated when a 1m bar closes
+                try:
+                    trader.momentum_tick(symbol, ticker_data, window_rsi, signal_time=received)
+                except Exception as e:
+                    log.warning(f"Failed to generate and execute signals for {symbol}: {e}")
+
+            # book + trades land through DataHandler on a slower cadence
+            if time.monotonic() - last_flush >= flush_interval:
+                last_flush = time.monotonic()
+                order_book = stream.get_order_book(symbol)
+                if order_book:
+                    data_handler.save_order_book(symbol, order_book)
+                trades = stream.drain_trades(symbol)
+                if trades["history"]:
+                    data_handler.append_trade_history(symbol, trades)
+                    if candles is not None:
+                        candles.update()
+    finally:
+        stream.stop()
+
+
+def scan_universe(data_handler, trader, log, scanner=None, max_orders=5):
+    """
+    Momentum over every tradeable instrument in one pass (pre-aggregated 1m bars, see data/candles.py)
+    instead of trader.momentum per symbol. Executes the strongest max_orders signals.
+    """
+    try:
+        symbols = [inst["symbol"] for inst in data_handler.get_instruments() if inst["tradeable"]]
+    except Exception as e:
+        log.warning(f"Failed to fetch instruments: {e}")
+        return None
+
+    scanner = scanner or UniverseScanner(log)
+    results = scanner.run_cycle(data_handler, symbols)
+    signal_time = time.perf_counter()
+    for r in results[:max_orders]:
+        log.info(f"{r['symbol']}: signal {r['signal']} (RSI {r['RSI']:.1f}, strength {r['strength']:.1f})")
+    return trader.execute_scan(results, max_orders=max_orders, signal_time=signal_time)
+
+
+def strategy_test(data_handler, trader, log, lake=None):
         log.info("Starting strat test...")
         # Need last 100 tickers for one symbol (testing)
         # And orderbook (for liquidity check)
 
         ohlcv_keys = ["lastTime", "open24h", "high24h", "low24h", "last", "vol24h"]
-        df = pd.DataFrame(columns=ohlcv_keys)
-        window_rsi = 14
+        window_rsi = MOMENTUM_RSI_WINDOW
 
         # just get top one for testing
         try:
             symbol = data_handler.get_instruments()[0]["symbol"]
-            tickers_list = data_handler.get_tickers(symbol)
+            # pre-aggregated 1m bars from the candle store (data/candles.py) when there are any
+            bars = data_handler.get_ohlcv_df(symbol, "1m", fill=True)
+            if len(bars):
+                df = None
+            elif lake is not None:
+                # research runs: read the exported Parquet/Arrow copy instead of the DB
+                data_handler.export_to_lake(lake, symbol, tables=("tickers",))
+                df = lake.read("tickers", symbol, columns=ohlcv_keys)
+            else:
+                df = data_handler.get_tickers_df(symbol, columns=ohlcv_keys)
         except Exception as e:
             log.warning(f"Failed to establish symbol: {e}")
+            return
 
-
-        for tick in tickers_list:
-            ohclv_data = {k: tick[k] for k in ohlcv_keys if k in tick}
-            new_row = pd.DataFrame([ohclv_data])
-            df = pd.concat([df, new_row])
-        log.info(f"Loaded {len(tickers_list)} ticker(s) into memory")
+        log.info(f"Loaded {len(bars)} bar(s)" if df is None else f"Loaded {len(df)} ticker(s) into memory")
 
 
         try:
-            res = trader.momentum(df, symbol, window_rsi)
+            if df is None:
+                res = trader.momentum_ohlcv(bars, symbol, window_rsi)
+            else:
+                res = trader.momentum(df, symbol, window_rsi)
             log.info(f"Result:\n{res}")
         except Exception as e:
             log.warning(f"Failed to generate and execute signals for {symbol}: {e}")
 
 
 def main():
+    recorder = None
     try:
         # Init logger
         log = Logger().get_logger()
 
-        # Init exchange + data
-        exchange = ExchangeWrapper(log)
+        # latency histograms: GET /metrics and/or a Prometheus textfile
+        if METRICS_PORT:
+            log.info(f"Serving metrics on :{METRICS.serve(METRICS_PORT)}/metrics")
+        if METRICS_DUMP_PATH:
+            METRICS.start_dump(METRICS_DUMP_PATH)
+
+        # raw exchange responses for offline replay (python -m backtest.replay RECORD_PATH)
+        if RECORD_PATH:
+            recorder = ResponseRecorder(RECORD_PATH, log)
+
+        # Init exchange + data; one RateLimiter for every REST client in the process
+        rate_limiter = RateLimiter(log)
+        exchange = ExchangeWrapper(log, rate_limiter=rate_limiter, recorder=recorder)
         data_handler = DataHandler(DATABASE_URL, log)
         trader = Trader(exchange, log)
+        # live orders: signals go to sendorder instead of the api-key check
+        # from exchange.order_entry import OrderEntry
+        # order_entry = OrderEntry(exchange, log, rate_limiter=rate_limiter)
+        # order_entry.warm_up()
+        # trader = Trader(exchange, log, order_entry=order_entry)
+        # refresher = MarketDataRefresher(exchange, data_handler, log)
+        # from exchange.async_exchange_wrapper import AsyncExchangeWrapper
+        # async_exchange = AsyncExchangeWrapper(log, rate_limiter=rate_limiter, recorder=recorder)  # same token bucket
+        # from data.lake import MarketDataLake
+        # lake = MarketDataLake(log)  # needs pyarrow
+        # from data.candles import CandleAggregator
+        # candles = CandleAggregator(data_handler, log)
 
         # init db
         # initialize_database(data_handler, exchange, log)
 
+        # schema upgrade / partitioning (once), rollover + retention (daily)
+        # from data.maintenance import TimeSeriesMaintenance
+        # maintenance = TimeSeriesMaintenance(data_handler, log)
+        # maintenance.upgrade_indexes()
+        # maintenance.compact_types()  # once, in a maintenance window: rewrites instruments, trade_history, order_books
+        # maintenance.partition_table("trade_history")
+        # maintenance.rollover()
+
 
         # call every __ min
-        # live_trading(data_handler, exchange, trader, log)
+        # live_trading(data_handler, exchange, trader, log, refresher, candles)
         # live_trading_test(data_handler, exchange, trader, log)
+        # live_trading_stream(data_handler, trader, log)
+        # strategy_test(data_handler, trader, log, lake)
+        # scan_universe(data_handler, trader, log)
         strategy_test(data_handler, trader, log)
     except KeyboardInterrupt:
         log.info(f"\nKeyboard interrupt received. Shutting down...")
     finally:
+        if recorder is not None:
+            recorder.close()
+        if METRICS_DUMP_PATH:
+            METRICS.dump(METRICS_DUMP_PATH)
         log.info("Shutdown")
 
 
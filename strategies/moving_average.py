@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
 
+# relative gap under which the batch path treats the two MAs as equal (no signal): the cumulative-sum
+# means carry rounding error of ~len(close) * 1e-16, while pandas rolling means are exact on flat windows
+MA_TIE_RTOL = 1e-9
+
 class MovingAverageStrategy:
     def __init__(self, short_window=10, long_window=30, logger=None):
         self.short_window = short_window
@@ -14,4 +19,53 @@ class MovingAverageStrategy:
         df["signal"] = 0
         df.loc[df["short_ma"] > df["long_ma"], "signal"] = 1
         df.loc[df["short_ma"] < df["long_ma"], "signal"] = -1
-        return df
\ No newline at end of file
+        return df
+
+    @staticmethod
+    def rolling_means(close, windows):
+        """
+        rolling(window).mean() for every window from one cumulative sum.
+        Returns {window: array}; NaN until the window is full or while it contains a NaN, as in pandas.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        n = len(close)
+        missing = np.isnan(close)
+
+        # centre on the first value so the running sum, and its rounding error, stay small
+        base = close[~missing][0] if (~missing).any() else 0.0
+        csum = np.zeros(n + 1)
+        np.cumsum(np.where(missing, 0.0, close - base), out=csum[1:])
+        if missing.any():
+            nan_count = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(missing, out=nan_count[1:])
+
+        means = {}
+        for w in set(windows):
+            ma = np.full(n, np.nan)
+            if 0 < w <= n:
+                ma[w - 1:] = (csum[w:] - csum[:-w]) / w + base
+                if missing.any():
+                    ma[w - 1:][nan_count[w:] - nan_count[:-w] > 0] = np.nan
+            means[w] = ma
+        return means
+
+    @staticmethod
+    def generate_signals_batch(data, windows):
+        """
+        Signals for many (short_window, long_window) pairs in one pass.
+        data: DataFrame with a close column, Series or array; it is not copied or modified.
+        Returns an int8 matrix of shape (len(windows), len(data)), rows in windows order.
+        MAs within MA_TIE_RTOL of each other count as equal (0), as the exact means would.
+        """
+        close = data["close"].to_numpy() if isinstance(data, pd.DataFrame) else data
+        windows = list(windows)
+        means = MovingAverageStrategy.rolling_means(close, [w for pair in windows for w in pair])
+
+        signals = np.zeros((len(windows), len(close)), dtype=np.int8)
+        with np.errstate(invalid="ignore"):
+            for i, (short_window, long_window) in enumerate(windows):
+                short_ma, long_ma = means[short_window], means[long_window]
+                apart = ~np.isclose(short_ma, long_ma, rtol=MA_TIE_RTOL, atol=0.0)
+                signals[i][apart & (short_ma > long_ma)] = 1
+                signals[i][apart & (short_ma < long_ma)] = -1
+        return signals
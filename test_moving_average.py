@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from strategies.moving_average import MovingAverageStrategy
+from utils.logger import Logger
+
+
+# generate_signals_batch has to match generate_signals bar for bar. Flat stretches are the hard case:
+# there the short and long MA are exactly equal (signal 0), which cumulative-sum means only get
+# right within rounding error.
+
+WINDOWS = [(s, l) for s in (2, 3, 5, 10, 20) for l in (5, 10, 30, 60) if s < l]
+
+
+def flat_segment_prices(segments=300, seed=3):
+    """Alternating flat runs (one-decimal price held 5-80 bars) and short random walks."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(segments):
+        parts.append(np.full(rng.integers(5, 80), round(rng.uniform(50, 150), 1)))
+        parts.append(parts[-1][-1] + np.cumsum(rng.normal(0, 0.3, rng.integers(5, 40))))
+    return np.concatenate(parts)
+
+
+def main():
+    log = Logger().get_logger()
+    log.info("==== TESTING MOVING AVERAGE BATCH SIGNALS ====")
+
+    close = flat_segment_prices()
+    batch = MovingAverageStrategy.generate_signals_batch(close, WINDOWS)
+
+    mismatched = []
+    for i, (short_window, long_window) in enumerate(WINDOWS):
+        strategy = MovingAverageStrategy(short_window, long_window, logger=log)
+        scalar = strategy.generate_signals(pd.DataFrame({"close": close}))["signal"].to_numpy()
+        diff = np.flatnonzero(scalar != batch[i])
+        if len(diff):
+            mismatched.append((short_window, long_window, len(diff), int(diff[0])))
+
+    if mismatched:
+        log.error(f"Batch and scalar signals differ (short, long, bars, first bar): {mismatched}")
+    else:
+        log.info(f"Batch matches scalar on {len(close)} bars x {len(WINDOWS)} window pairs")
+
+    log.info("==== TESTING COMPLETE ====")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from aiohttp import web
+from exchange.market_stream import MarketDataStream
+from utils.logger import Logger
+
+
+# Local fake of the Kraken Futures websocket: no network needed.
+# First connection drops after a few messages, second one sends a book seq gap.
+
+SYMBOL = "PI_XBTUSD"
+
+
+class FakeKrakenWs:
+    def __init__(self):
+        self.connections = 0
+        self.gap_sent = False
+        self.subscriptions = []
+        self.runner = None
+        self.port = None
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        connection = self.connections
+        now = int(time.time() * 1000)
+
+        async for msg in ws:
+            data = json.loads(msg.data)
+            self.subscriptions.append((connection, data["event"], data["feed"]))
+            await ws.send_json({"event": f"{data['event']}d", "feed": data["feed"], "product_ids": data.get("product_ids")})
+
+            if data["event"] != "subscribe":
+                continue
+
+            if data["feed"] == "ticker":
+                await ws.send_json({"feed": "ticker", "product_id": SYMBOL, "last": 111000.0 + connection,
+                                    "time": now, "volume": 3729318, "open": 108823, "high": 111787.5, "low": 108754})
+            elif data["feed"] == "book" and connection == 1:
+                await ws.send_json({"feed": "book_snapshot", "product_id": SYMBOL, "seq": 1,
+                                    "bids": [{"price": 100.0, "qty": 5}, {"price": 99.5, "qty": 3}],
+                                    "asks": [{"price": 100.5, "qty": 4}]})
+                await ws.send_json({"feed": "book", "product_id": SYMBOL, "side": "buy", "seq": 2, "price": 99.5, "qty": 0})
+            elif data["feed"] == "book" and connection == 2 and not self.gap_sent:
+                self.gap_sent = True
+                await ws.send_json({"feed": "book_snapshot", "product_id": SYMBOL, "seq": 10,
+                                    "bids": [{"price": 101.0, "qty": 1}], "asks": [{"price": 101.5, "qty": 2}]})
+                # seq 12 skips 11 -> client should unsubscribe + resubscribe book
+                await ws.send_json({"feed": "book", "product_id": SYMBOL, "side": "sell", "seq": 12, "price": 102.0, "qty": 7})
+            elif data["feed"] == "trade":
+                await ws.send_json({"feed": "trade", "product_id": SYMBOL, "uid": f"t{connection}", "side": "buy",
+                                    "type": "fill", "seq": connection, "time": now, "qty": 10, "price": 111000.0})
+                if connection == 1:
+                    await ws.close()  # simulate a dropped connection
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws/v1", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def run(log):
+    server = FakeKrakenWs()
+    await server.start()
+
+    stream = MarketDataStream(log, [SYMBOL], url=f"http://127.0.0.1:{server.port}/ws/v1", heartbeat_timeout=2)
+    task = asyncio.create_task(stream.run())
+
+    await asyncio.sleep(2.5)
+    stream._stop.set()
+    if stream._ws is not None:
+        await stream._ws.close()
+    await task
+    await server.stop()
+
+    return server, stream
+
+
+def main():
+    log = Logger().get_logger()
+    log.info("==== TESTING MARKET STREAM ====")
+
+    server, stream = asyncio.run(run(log))
+
+    if server.connections >= 2 and stream.reconnects >= 1:
+        log.info(f"Reconnected after drop: {server.connections} connections")
+    else:
+        log.error("Stream did not reconnect")
+
+    resubscribed = [s for s in server.subscriptions if s[0] == 2 and s[2] == "book"]
+    if ("unsubscribe" in [s[1] for s in resubscribed]) and len(resubscribed) >= 3:
+        log.info("Book resubscribed after sequence gap")
+    else:
+        log.error(f"Book was not resubscribed after gap: {resubscribed}")
+
+    ticker = stream.get_ticker(SYMBOL)
+    if ticker and ticker["ticker"]["last"] == 111002.0 and ticker["ticker"]["vol24h"] == 3729318:
+        log.info(f"Ticker in REST shape: {ticker['ticker']}")
+    else:
+        log.error(f"Unexpected ticker state: {ticker}")
+
+    trades = stream.drain_trades(SYMBOL)["history"]
+    if len(trades) == 2 and trades[0]["size"] == 10:
+        log.info(f"Trades in REST shape: {len(trades)} trades")
+    else:
+        log.error(f"Unexpected trade state: {trades}")
+
+    log.info("==== TESTING COMPLETE ====")
+
+
+if __name__ == "__main__":
+    main()
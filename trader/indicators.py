@@ -0,0 +1,238 @@
+import math
+from collections import deque
+
+from config.settings import (
+    MOMENTUM_RSI_WINDOW, MOMENTUM_MACD_SHORT, MOMENTUM_MACD_LONG, MOMENTUM_MACD_SIGNAL, MOMENTUM_VOLUME_WINDOW
+)
+
+
+# Streaming indicators: O(1) per bar, state is a few floats that round-trip through state()/from_state().
+# Values match the pandas versions used in Trader.momentum (ewm(adjust=False), rolling().mean()).
+
+NAN = float("nan")
+
+
+class EMA:
+    """ewm(span=span, adjust=False).mean(), seeded with the first value."""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, x):
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def state(self):
+        return {"span": self.span, "value": self.value}
+
+    @classmethod
+    def from_state(cls, state):
+        ema = cls(state["span"])
+        ema.value = state["value"]
+        return ema
+
+
+class RollingMean:
+    """rolling(window).mean(): NaN until window values have been seen."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.values) == self.window else NAN
+
+    def state(self):
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state):
+        rm = cls(state["window"])
+        for x in state["values"]:
+            rm.update(x)
+        return rm
+
+
+class RSI:
+    """
+    RSI over close-to-close changes.
+    method="sma": rolling mean of gains/losses (what Trader.momentum computes).
+    method="wilder": Wilder smoothing, seeded with the SMA of the first window changes.
+    """
+
+    def __init__(self, window=14, method="sma"):
+        if method not in ("sma", "wilder"):
+            raise ValueError("method must be 'sma' or 'wilder'")
+        self.window = window
+        self.method = method
+        self.prev = None
+        self.gain = RollingMean(window)
+        self.loss = RollingMean(window)
+        self.avg_gain = None
+        self.avg_loss = None
+        self.value = NAN
+
+    def update(self, close):
+        if self.prev is None:
+            # first bar counts as a zero change, as delta.where(delta > 0, 0) does in pandas
+            self.prev = close
+            self.gain.update(0.0)
+            self.loss.update(0.0)
+            return self.value
+
+        delta = close - self.prev
+        self.prev = close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        if self.method == "sma" or self.avg_gain is None:
+            avg_gain, avg_loss = self.gain.update(gain), self.loss.update(loss)
+            if self.method == "wilder" and not math.isnan(avg_gain):
+                self.avg_gain, self.avg_loss = avg_gain, avg_loss
+        else:
+            n = self.window
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+            avg_gain, avg_loss = self.avg_gain, self.avg_loss
+
+        if math.isnan(avg_gain):
+            self.value = NAN
+        elif avg_loss == 0:
+            # pandas: gain / 0 -> inf -> RSI 100; 0 / 0 -> NaN
+            self.value = 100.0 if avg_gain > 0 else NAN
+        else:
+            self.value = 100 - 100 / (1 + avg_gain / avg_loss)
+        return self.value
+
+    def state(self):
+        return {
+            "window": self.window, "method": self.method, "prev": self.prev,
+            "gain": self.gain.state(), "loss": self.loss.state(),
+            "avg_gain": self.avg_gain, "avg_loss": self.avg_loss, "value": self.value,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        rsi = cls(state["window"], state["method"])
+        rsi.prev = state["prev"]
+        rsi.gain = RollingMean.from_state(state["gain"])
+        rsi.loss = RollingMean.from_state(state["loss"])
+        rsi.avg_gain, rsi.avg_loss, rsi.value = state["avg_gain"], state["avg_loss"], state["value"]
+        return rsi
+
+
+class MACD:
+    """MACD line (EMA short - EMA long) and its signal line (EMA of MACD)."""
+
+    def __init__(self, short_window=12, long_window=26, signal_window=9):
+        self.short = EMA(short_window)
+        self.long = EMA(long_window)
+        self.signal = EMA(signal_window)
+        self.macd = None
+
+    def update(self, close):
+        self.macd = self.short.update(close) - self.long.update(close)
+        self.signal.update(self.macd)
+        return self.macd, self.signal.value
+
+    def state(self):
+        return {"short": self.short.state(), "long": self.long.state(), "signal": self.signal.state(), "macd": self.macd}
+
+    @classmethod
+    def from_state(cls, state):
+        macd = cls.__new__(cls)
+        macd.short = EMA.from_state(state["short"])
+        macd.long = EMA.from_state(state["long"])
+        macd.signal = EMA.from_state(state["signal"])
+        macd.macd = state["macd"]
+        return macd
+
+
+class MomentumIndicators:
+    """
+    Per-symbol indicator state for the momentum strategy.
+    Ticks are bucketed into bar_seconds candles (close = last price, volume = sum, gaps forward-filled
+    with zero volume, like resample().ohlc() + ffill); indicators update once per closed bar.
+    """
+
+    def __init__(self, window_rsi=MOMENTUM_RSI_WINDOW, rsi_method="sma", short_window=MOMENTUM_MACD_SHORT,
+                 long_window=MOMENTUM_MACD_LONG, signal_window=MOMENTUM_MACD_SIGNAL,
+                 volume_window=MOMENTUM_VOLUME_WINDOW, bar_seconds=60):
+        self.bar_seconds = bar_seconds
+        self.rsi = RSI(window_rsi, rsi_method)
+        self.macd = MACD(short_window, long_window, signal_window)
+        self.vol_avg = RollingMean(volume_window)
+
+        self.bar_start = None   # epoch seconds of the open bar
+        self.bar_close = None
+        self.bar_volume = 0.0
+        self.latest = None      # indicator values at the last closed bar
+
+    def _close_bar(self, close, volume):
+        rsi = self.rsi.update(close)
+        macd, signal = self.macd.update(close)
+        vol_avg = self.vol_avg.update(volume)
+        self.latest = {"close": close, "volume": volume, "RSI": rsi, "MACD": macd, "Signal": signal, "vol_avg": vol_avg}
+        return self.latest
+
+    def update(self, ts, price, volume=0.0):
+        """
+        Feed one tick (ts in epoch seconds). Returns the latest closed-bar values if this tick
+        closed one or more bars, else None.
+        """
+        bar = int(ts // self.bar_seconds) * self.bar_seconds
+
+        if self.bar_start is None:
+            self.bar_start, self.bar_close, self.bar_volume = bar, price, volume
+            return None
+
+        if bar < self.bar_start:
+            return None  # late tick for an already closed bar
+
+        if bar == self.bar_start:
+            self.bar_close = price
+            self.bar_volume += volume
+            return None
+
+        closed = self._close_bar(self.bar_close, self.bar_volume)
+        # forward-fill empty bars in between
+        for _ in range((bar - self.bar_start) // self.bar_seconds - 1):
+            closed = self._close_bar(self.bar_close, 0.0)
+
+        self.bar_start, self.bar_close, self.bar_volume = bar, price, volume
+        return closed
+
+    def state(self):
+        return {
+            "bar_seconds": self.bar_seconds,
+            "rsi": self.rsi.state(),
+            "macd": self.macd.state(),
+            "vol_avg": self.vol_avg.state(),
+            "bar_start": self.bar_start,
+            "bar_close": self.bar_close,
+            "bar_volume": self.bar_volume,
+            "latest": self.latest,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        ind = cls.__new__(cls)
+        ind.bar_seconds = state["bar_seconds"]
+        ind.rsi = RSI.from_state(state["rsi"])
+        ind.macd = MACD.from_state(state["macd"])
+        ind.vol_avg = RollingMean.from_state(state["vol_avg"])
+        ind.bar_start = state["bar_start"]
+        ind.bar_close = state["bar_close"]
+        ind.bar_volume = state["bar_volume"]
+        ind.latest = state["latest"]
+        return ind
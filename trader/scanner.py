@@ -0,0 +1,161 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from data.data_handler import timeframe_delta
+from config.settings import (
+    SCAN_BARS, SCAN_BUDGET_SECONDS, MOMENTUM_RSI_WINDOW, MOMENTUM_MACD_SHORT, MOMENTUM_MACD_LONG,
+    MOMENTUM_MACD_SIGNAL, MOMENTUM_VOLUME_WINDOW
+)
+from utils.metrics import METRICS
+
+
+class UniverseScanner:
+    """
+    Momentum scan over the whole instrument universe in one vectorized pass.
+
+    Holds close/volume as (symbols x bars) matrices and computes the Trader.momentum indicators
+    (SMA RSI, MACD/Signal, 20-bar volume average) for every symbol at once, then ranks the symbols
+    whose latest bar gives a signal under the same rules as Trader._momentum_signal.
+    """
+
+    def __init__(self, logger, window_rsi=MOMENTUM_RSI_WINDOW, short_window=MOMENTUM_MACD_SHORT,
+                 long_window=MOMENTUM_MACD_LONG, signal_window=MOMENTUM_MACD_SIGNAL,
+                 volume_window=MOMENTUM_VOLUME_WINDOW, bars=SCAN_BARS, budget=SCAN_BUDGET_SECONDS):
+        self.logger = logger
+        self.window_rsi = window_rsi
+        self.short_window = short_window
+        self.long_window = long_window
+        self.signal_window = signal_window
+        self.volume_window = volume_window
+        self.bars = bars
+        self.budget = budget  # seconds per cycle (load + scan) before a warning is logged
+
+        self.symbols = []
+        self.timestamps = None
+        self.close = np.empty((0, 0))
+        self.volume = np.empty((0, 0))
+        self.last_cycle = None
+
+    # -----------------------
+    # Data
+    # -----------------------
+
+    def set_matrix(self, symbols, close, volume, timestamps=None):
+        """Use (symbols x bars) close/volume arrays directly (oldest bar first)."""
+        self.symbols = list(symbols)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.timestamps = timestamps
+
+    def load(self, data_handler, symbols, timeframe="1m", start=None):
+        """Fill the matrices from the candle store with one query (last self.bars bars before now by default)."""
+        if start is None:
+            start = datetime.utcnow() - self.bars * timeframe_delta(timeframe)
+        close, volume = data_handler.get_ohlcv_panel(symbols, timeframe, start)
+        close, volume = close.tail(self.bars), volume.tail(self.bars)
+        self.set_matrix(close.columns, close.to_numpy().T, volume.to_numpy().T, close.index)
+
+    def push(self, close, volume):
+        """Append one bar per symbol (arrays in self.symbols order), dropping the oldest."""
+        self.close = np.concatenate([self.close[:, 1:], np.asarray(close, dtype=np.float64)[:, None]], axis=1)
+        self.volume = np.concatenate([self.volume[:, 1:], np.asarray(volume, dtype=np.float64)[:, None]], axis=1)
+
+    # -----------------------
+    # Indicators (all symbols at once)
+    # -----------------------
+
+    @staticmethod
+    def _ema(x, span):
+        """ewm(span, adjust=False).mean() along axis 1, seeded at each row's first non-NaN value."""
+        alpha = 2 / (span + 1)
+        out = np.empty_like(x)
+        ema = np.full(x.shape[0], np.nan)
+        for t in range(x.shape[1]):
+            col = x[:, t]
+            ema = np.where(np.isnan(ema), col, np.where(np.isnan(col), ema, alpha * col + (1 - alpha) * ema))
+            out[:, t] = ema
+        return out
+
+    def indicators(self):
+        """Latest-bar RSI, MACD, Signal, volume and vol_avg per symbol (arrays in self.symbols order)."""
+        close, volume = self.close, self.volume
+        n = self.window_rsi
+
+        # RSI as in Trader.momentum: rolling mean of gains / losses over the last n changes
+        delta = np.diff(close[:, -(n + 1):], axis=1)
+        gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+        loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + gain / loss)
+        # not enough history, or a NaN inside the window
+        rsi[(close.shape[1] <= n) | np.isnan(delta).any(axis=1)] = np.nan
+
+        macd = self._ema(close, self.short_window) - self._ema(close, self.long_window)
+        signal_line = self._ema(macd, self.signal_window)
+
+        recent = volume[:, -self.volume_window:]
+        vol_avg = recent.mean(axis=1) if volume.shape[1] >= self.volume_window else np.full(len(volume), np.nan)
+
+        return {
+            "RSI": rsi,
+            "MACD": macd[:, -1],
+            "Signal": signal_line[:, -1],
+            "close": close[:, -1],
+            "volume": volume[:, -1],
+            "vol_avg": vol_avg,
+        }
+
+    def scan(self):
+        """
+        Ranked actionable signals: list of dicts (symbol, signal, strength, RSI, MACD, Signal,
+        close, volume, vol_avg), strongest first. strength is how far RSI is past its threshold.
+        """
+        if not len(self.symbols) or self.close.shape[1] <= self.window_rsi:
+            return []  # not enough bars for RSI yet
+        ind = self.indicators()
+        rsi = ind["RSI"]
+
+        with np.errstate(invalid="ignore"):
+            signal = np.where(rsi < 30, 1, np.where(rsi > 70, -1, 0))
+            signal[ind["volume"] < ind["vol_avg"]] = 0
+            strength = np.where(signal == 1, 30 - rsi, rsi - 70)
+
+        hits = np.flatnonzero(signal)
+        hits = hits[np.argsort(-strength[hits])]
+        return [
+            {
+                "symbol": self.symbols[i],
+                "signal": int(signal[i]),
+                "strength": float(strength[i]),
+                **{k: float(v[i]) for k, v in ind.items()},
+            }
+            for i in hits
+        ]
+
+    def run_cycle(self, data_handler, symbols, timeframe="1m", start=None):
+        """load + scan, timed against the cycle budget. Stats in self.last_cycle."""
+        t0 = time.perf_counter()
+        self.load(data_handler, symbols, timeframe, start)
+        t1 = time.perf_counter()
+        results = self.scan()
+        t2 = time.perf_counter()
+
+        self.last_cycle = {
+            "symbols": len(self.symbols), "bars": self.close.shape[1], "signals": len(results),
+            "load_time": t1 - t0, "scan_time": t2 - t1, "wall_time": t2 - t0,
+        }
+        if self.last_cycle["wall_time"] > self.budget:
+            self.logger.warning(
+                f"Scan cycle over budget: {self.last_cycle['wall_time']:.3f}s > {self.budget:.3f}s "
+                f"(load {t1 - t0:.3f}s, scan {t2 - t1:.3f}s)"
+            )
+        self.logger.info(
+            f"Scanned {len(self.symbols)} symbol(s) x {self.close.shape[1]} bar(s): "
+            f"{len(results)} signal(s) in {t2 - t0:.3f}s"
+        )
+        return results
+
+
+METRICS.instrument(UniverseScanner, "scanner_call_seconds", methods=("load", "scan"))
@@ -1,12 +1,27 @@
+import logging
+import time
+from contextlib import nullcontext
+
 import pandas as pd
+from trader.indicators import MomentumIndicators
+from utils.logger import log_frame
+from utils.metrics import METRICS
+from config.settings import (
+    MAX_SLIPPAGE_BPS, MOMENTUM_RSI_WINDOW, MOMENTUM_MACD_SHORT, MOMENTUM_MACD_LONG, MOMENTUM_MACD_SIGNAL,
+    MOMENTUM_VOLUME_WINDOW
+)
 
 
 class Trader:
     """Takes a signal (+ additional rules) and decides whether to place an order via exchange_wrapper"""
 
-    def __init__(self, exchange_wrapper, logger):
+    def __init__(self, exchange_wrapper, logger, books=None, order_entry=None, book_lock=None):
         self.exchange = exchange_wrapper
         self.logger = logger
+        self.books = books  # optional symbol -> L2Book (e.g. MarketDataStream.books) for liquidity checks
+        self.book_lock = book_lock  # lock the books' writer holds while updating (MarketDataStream.state_lock)
+        self.order_entry = order_entry  # optional OrderEntry: signals become real orders
+        self.indicators = {}  # symbol -> MomentumIndicators (momentum_tick)
         self.logger.info("Initialized Trader")
 
 	# 1. Momentum Investing (short-term RSI, MACD, Volume indicators)
@@ -15,21 +30,22 @@ class Trader:
 	# 	○ Good way to learn backtesting and live execution.
 
 
-    def momentum(self, data, symbol, window_rsi=14, amount=1.00):
+    def momentum(self, data, symbol, window_rsi=MOMENTUM_RSI_WINDOW, amount=1.00, signal_time=None):
         """
         RSI: Buy if <30 (oversold), sell if >70 (overbought)
         MACD: Buy if line crosses above signal line, vice-versa
         Volume: Used to confirm signals; only if volume is above average
+        signal_time (perf_counter) starts the signal-to-ack latency sample; defaults to when the
+        latest bar is evaluated.
         """
         self.logger.info(f"Starting Momentum strategy for: {symbol}")
-        self.logger.info(f"{data}")
 
         if len(data) <= window_rsi:
             window_rsi = len(data) - 1
             self.logger.info(f"Too few rows, setting window_rsi to: {window_rsi}")
-        window_rsi = 5
 
         df = pd.DataFrame(data)
+        log_frame(self.logger, logging.DEBUG, "Momentum input for %s:", df, symbol)
         # lastTime, open24h, high24h, low24h, last, vol24h
 
         df['lastTime'] = pd.to_datetime(df['lastTime'])
@@ -44,37 +60,59 @@ class Trader:
         candles['volume'] = df['volume'].resample('1T').sum()
         candles.fillna(method="ffill", inplace=True)
 
-        self.logger.info(f"{candles}")
+        log_frame(self.logger, logging.DEBUG, "1m candles for %s:", candles, symbol)
         # 2025-09-04 13:15:00  111064.0  111064.0  111064.0  111064.0  509112.0
         # 2025-09-04 13:16:00  111050.5  111050.5  111050.5  111050.5  510705.0
 
 
+        self._momentum_indicators(candles, window_rsi)
+
+        # Generate signals
+        latest = candles.iloc[-1]
+        signal_time = time.perf_counter() if signal_time is None else signal_time
+        signal = self._momentum_signal(symbol, latest, amount)
+
+        # execute trade using signals
+        return self.execute_signal(symbol, signal, amount, signal_time)
+
+    def momentum_ohlcv(self, candles, symbol, window_rsi=MOMENTUM_RSI_WINDOW, amount=1.00, signal_time=None):
+        """
+        Momentum on pre-aggregated bars (DataHandler.get_ohlcv_df(..., fill=True)): same rules as
+        momentum(), without rebuilding candles from ticker snapshots.
+        """
+        self.logger.info(f"Starting Momentum strategy on {len(candles)} bar(s) for: {symbol}")
+        candles = candles[["close", "volume"]].astype(float)
+        self._momentum_indicators(candles, window_rsi)
+
+        latest = candles.iloc[-1]
+        signal_time = time.perf_counter() if signal_time is None else signal_time
+        signal = self._momentum_signal(symbol, latest, amount)
+        return self.execute_signal(symbol, signal, amount, signal_time)
+
+    def _momentum_indicators(self, candles, window_rsi):
+        """Adds RSI, MACD/Signal and vol_avg columns to a close/volume candle frame."""
         # calc RSI
         delta = candles["close"].diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=window_rsi).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=window_rsi).mean()
         rs = gain / loss
         candles["RSI"] = 100 - (100 / (1 + rs))
-        self.logger.info(f"RSI calculated: \n{candles["RSI"]}")
+        log_frame(self.logger, logging.DEBUG, "RSI calculated:", candles["RSI"])
 
         # calc MACD
-        short_window = 12
-        long_window = 26
-        signal_window = 9
-        candles["EMA_short"] = candles["close"].ewm(span=short_window, adjust=False).mean()
-        candles["EMA_long"] = candles["close"].ewm(span=long_window, adjust=False).mean()
+        candles["EMA_short"] = candles["close"].ewm(span=MOMENTUM_MACD_SHORT, adjust=False).mean()
+        candles["EMA_long"] = candles["close"].ewm(span=MOMENTUM_MACD_LONG, adjust=False).mean()
         candles["MACD"] = candles["EMA_short"] - candles["EMA_long"]
-        candles["Signal"] = candles["MACD"].ewm(span=signal_window, adjust=False).mean()
-        self.logger.info(f"MACD calculated: \n{candles["Signal"]}")
+        candles["Signal"] = candles["MACD"].ewm(span=MOMENTUM_MACD_SIGNAL, adjust=False).mean()
+        log_frame(self.logger, logging.DEBUG, "MACD calculated:", candles["Signal"])
 
 
         # filter low volume
-        candles["vol_avg"] = candles["volume"].rolling(window=20).mean()
+        candles["vol_avg"] = candles["volume"].rolling(window=MOMENTUM_VOLUME_WINDOW).mean()
 
-        # Generate signals
+    def _momentum_signal(self, symbol, latest, amount):
+        """Signal from the latest bar's RSI/MACD/Signal/volume/vol_avg (shared by momentum and momentum_tick)."""
         signal = 0  # 1 = buy, -1 = sell, 0 = hold
-        latest = candles.iloc[-1]
-
 
         if latest["RSI"] < 30:
             signal = 1
@@ -91,47 +129,105 @@ class Trader:
         if latest["volume"] < latest["vol_avg"]:
             signal = 0
 
-        # execute trade using signals
-        return self.execute_signal(symbol, signal, amount)
+        # skip if the book can't absorb the order
+        if signal != 0 and not self.has_liquidity(symbol, "buy" if signal == 1 else "sell", amount):
+            signal = 0
 
+        return signal
 
+    def momentum_tick(self, symbol, ticker, window_rsi=MOMENTUM_RSI_WINDOW, amount=1.00, signal_time=None):
+        """
+        Streaming momentum: feed one ticker (lastTime, last, vol24h) into the symbol's incremental
+        indicators. Only when the tick closes a 1-minute bar is a signal evaluated and executed,
+        so the cost per tick is constant regardless of how much history has been seen.
+        signal_time (perf_counter) is when the tick arrived; defaults to now.
+        """
+        signal_time = time.perf_counter() if signal_time is None else signal_time
+        indicators = self.indicators.get(symbol)
+        if indicators is None:
+            indicators = self.indicators[symbol] = MomentumIndicators(window_rsi=window_rsi)
+
+        ts = pd.Timestamp(ticker["lastTime"]).timestamp()
+        latest = indicators.update(ts, float(ticker["last"]), float(ticker.get("vol24h") or 0.0))
+        if latest is None:
+            return None
+
+        signal = self._momentum_signal(symbol, latest, amount)
+        self.logger.debug("%s bar closed: %s -> signal %s", symbol, latest, signal)
+        return self.execute_signal(symbol, signal, amount, signal_time)
+
+    def execute_scan(self, results, amount=1.00, max_orders=None, signal_time=None):
+        """
+        Act on UniverseScanner.scan() output (strongest first): liquidity check, then execute.
+        signal_time (perf_counter) is when the scan produced results; defaults to now.
+        Returns {symbol: execute_signal result} for the signals that were sent.
+        """
+        signal_time = time.perf_counter() if signal_time is None else signal_time
+        executed = {}
+        for result in results:
+            if max_orders is not None and len(executed) >= max_orders:
+                break
+            symbol, signal = result["symbol"], result["signal"]
+            if not self.has_liquidity(symbol, "buy" if signal == 1 else "sell", amount):
+                continue
+            executed[symbol] = self.execute_signal(symbol, signal, amount, signal_time)
+        return executed
+
+    def checkpoint(self):
+        """Indicator state per symbol as plain dicts (JSON-serialisable)."""
+        return {symbol: ind.state() for symbol, ind in self.indicators.items()}
+
+    def restore(self, checkpoint):
+        """Resume from checkpoint() output."""
+        self.indicators = {symbol: MomentumIndicators.from_state(state) for symbol, state in checkpoint.items()}
+
+
+
+    def has_liquidity(self, symbol, side, amount, max_slippage_bps=MAX_SLIPPAGE_BPS):
+        """
+        Liquidity check against the in-memory L2 book (no DB read).
+        True if a market order of `amount` fills within max_slippage_bps of mid, or if no book is tracked.
+        """
+        if not self.books:
+            return True
+        # the stream thread mutates the book's price levels in place; read them under its lock
+        with self.book_lock or nullcontext():
+            book = self.books.get(symbol)
+            if book is None:
+                return True
+            slippage = book.slippage_bps(amount, side)
+
+        if slippage is None or slippage > max_slippage_bps:
+            self.logger.info(f"Insufficient liquidity for {side} {amount} {symbol}: slippage {slippage} bps")
+            return False
+        return True
+
+    def execute_signal(self, symbol, signal, amount=1.00, signal_time=None):
+        # start of the signal-to-ack latency sample; callers pass when the signal was evaluated
+        signal_time = time.perf_counter() if signal_time is None else signal_time
+
+        if signal != 0 and self.order_entry is not None:
+            side = "buy" if signal == 1 else "sell"
+            return self.order_entry.send_order(symbol, side, amount, signal_time=signal_time)
 
-    def execute_signal(self, symbol, signal, amount=1.00):
         if signal == 1:
-            print(f"Buying {symbol}...")
+            self.logger.info(f"Buying {symbol}...")
             # return self.exchange.create_order(symbol, "buy", amount)
-            # params = {
-            #     "orderType": "mkt",
-            #     "symbol": symbol,
-            #     "side": "buy",
-            #     "size": amount,
-            # }
 
             endpoint = "/api/auth/v1/api-keys/v3/check"
             params = {}
 
-            # endpoint = "/api/v3/sendorder"
-            # params = {
-            #     "orderType": "mkt",
-            #     "symbol": symbol,
-            #     "side": "buy",
-            #     "size": amount,
-            #     # "limitPrice": limit_price,
-            # }
-
             return self.exchange.private_request(endpoint_path=endpoint, params=params)
  
         elif signal == -1:
-            # print(f"Selling {symbol}...")
-            # params = {
-            #     "orderType": "mkt",
-            #     "symbol": symbol,
-            #     "side": "buy",
-            #     "size": amount,
-            # }
-            # return self.exchange.private_request(endpoint_path="/sendorder", params=params)
+            self.logger.info(f"Selling {symbol}... (no order entry configured)")
             # return self.exchange.create_order(symbol, "sell", amount)
-            print(signal)
         else:
-            print("No trade signal")
-            return None
\ No newline at end of file
+            self.logger.debug(f"No trade signal for {symbol}")
+            return None
+
+
+# signal evaluation, indicator math and order submission
+METRICS.instrument(Trader, "trader_call_seconds", methods=(
+    "momentum", "momentum_ohlcv", "momentum_tick", "_momentum_indicators", "execute_signal", "execute_scan",
+))
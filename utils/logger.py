@@ -1,10 +1,64 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config.settings import (
+    LOG_LEVEL, LOG_ASYNC, LOG_FILE, LOG_JSON_PATH, LOG_JSON_MAX_BYTES, LOG_JSON_BACKUPS, LOG_FRAME_MAX_ROWS
+)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, msg (+ exc)."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread: the record goes on the queue with
+    msg/args untouched, so %-style arguments (and LazyFrame dumps) are rendered off the caller's thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class LazyFrame:
+    """DataFrame/Series snapshot that is only rendered to text when a handler formats the record."""
+
+    def __init__(self, frame, max_rows=LOG_FRAME_MAX_ROWS):
+        self.frame = frame.copy()  # the caller may keep mutating the original
+        self.max_rows = max_rows
+
+    def __str__(self):
+        return self.frame.to_string(max_rows=self.max_rows)
+
+
+def log_frame(logger, level, msg, frame, *args):
+    """Level-gated DataFrame dump: nothing is copied or rendered unless the logger has level enabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, msg + "\n%s", *args, LazyFrame(frame))
+
 
 class Logger:
-    def __init__(self, name: str = "trading-bot"):
+    def __init__(self, name: str = "trading-bot", level=LOG_LEVEL, async_mode=LOG_ASYNC, json_path=LOG_JSON_PATH):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)  # capture everything
+        self.logger.setLevel(level)  # DEBUG captures everything, INFO drops the DataFrame dumps
+        self.listener = None
 
         # prevent duplicate handlers
         if not self.logger.handlers:
@@ -21,16 +75,40 @@ class Logger:
             stderr_handler.setFormatter(stderr_fmt)
 
             # File handler (DEBUG)
-            file_handler = logging.FileHandler("trading_bot.log")
+            file_handler = logging.FileHandler(LOG_FILE)
             file_handler.setLevel(logging.DEBUG)
             file_fmt = logging.Formatter(
                 "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
             )
             file_handler.setFormatter(file_fmt)
 
-            self.logger.addHandler(stdout_handler)
-            self.logger.addHandler(stderr_handler)
-            self.logger.addHandler(file_handler)
+            handlers = [stdout_handler, stderr_handler, file_handler]
+
+            # Structured JSON-lines sink (DEBUG), rotated by size
+            if json_path:
+                json_handler = RotatingFileHandler(
+                    json_path, maxBytes=LOG_JSON_MAX_BYTES, backupCount=LOG_JSON_BACKUPS
+                )
+                json_handler.setLevel(logging.DEBUG)
+                json_handler.setFormatter(JsonLinesFormatter())
+                handlers.append(json_handler)
+
+            if async_mode:
+                # callers only enqueue; formatting and I/O happen on the listener thread
+                log_queue = queue.SimpleQueue()
+                self.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+                self.listener.start()
+                atexit.register(self.stop)
+                self.logger.addHandler(_DeferredQueueHandler(log_queue))
+            else:
+                for handler in handlers:
+                    self.logger.addHandler(handler)
+
+    def stop(self):
+        """Flush queued records and stop the listener thread (also runs at exit)."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
 
     def get_logger(self):
-        return self.logger
\ No newline at end of file
+        return self.logger
@@ -0,0 +1,217 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.settings import METRICS_ENABLED, METRICS_PORT, METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL
+
+
+# latency buckets (seconds): 10us to ~2 min, sqrt(2) apart
+BUCKETS = tuple(1e-5 * 2 ** (k / 2) for k in range(48))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus layout) with count, sum, min and max."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: > largest bucket
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate from the buckets, interpolated linearly inside the bucket that holds the rank
+        (bucket edges clamped to the observed min/max).
+        """
+        with self.lock:
+            counts, count, low, peak = list(self.counts), self.count, self.min, self.max
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = max(self.buckets[i - 1] if i else 0.0, low)
+                upper = min(self.buckets[i] if i < len(self.buckets) else peak, peak)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return peak
+
+
+class MetricsRegistry:
+    """
+    Process-wide timers: histograms keyed by metric name + labels.
+
+    timed()/instrument() wrap functions with two perf_counter calls and one bucket increment
+    (about a microsecond), so they stay on in production. Export with prometheus_text(), serve()
+    (GET /metrics) or start_dump() (textfile written every interval seconds).
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.histograms = {}  # (name, ((label, value), ...)) -> Histogram
+        self._lock = threading.Lock()
+        self._server = None
+        self._dump_thread = None
+        self._stop = threading.Event()
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(key, Histogram())
+        return hist
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with METRICS.timer("exchange_rtt_seconds"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator: observe every call's duration (exceptions included) under name/labels."""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+            hist = self.histogram(name, **labels)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def instrument(self, cls, name, methods=None, prefixes=(), exclude=()):
+        """Wrap a class's methods (by name and/or prefix) with timed(name, method=<method name>)."""
+        for attr, fn in list(vars(cls).items()):
+            if not callable(fn) or isinstance(fn, (staticmethod, classmethod)) or attr in exclude:
+                continue
+            if (methods and attr in methods) or (prefixes and attr.startswith(tuple(prefixes))):
+                setattr(cls, attr, self.timed(name, method=attr)(fn))
+        return cls
+
+    # -----------------------
+    # Export
+    # -----------------------
+
+    def summary(self):
+        """{"name{labels}": {count, mean, p50, p99, max}} in seconds."""
+        out = {}
+        for (name, labels), hist in sorted(self.histograms.items()):
+            if not hist.count:
+                continue
+            out[name + self._labels(labels)] = {
+                "count": hist.count,
+                "mean": hist.sum / hist.count,
+                "p50": hist.quantile(0.5),
+                "p99": hist.quantile(0.99),
+                "max": hist.max,
+            }
+        return out
+
+    @staticmethod
+    def _labels(labels, extra=None):
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def prometheus_text(self):
+        """All histograms in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+        for (name, labels), hist in sorted(self.histograms.items()):
+            with hist.lock:
+                counts, count, total = list(hist.counts), hist.count, hist.sum
+            if not count:
+                continue  # registered by instrument() but never called
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(hist.buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{self._labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+            lines.append(f"{name}_bucket{self._labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{name}_count{self._labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=METRICS_DUMP_PATH):
+        """Write prometheus_text() to path atomically (node_exporter textfile collector format)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def start_dump(self, path=METRICS_DUMP_PATH, interval=METRICS_DUMP_INTERVAL):
+        """dump() every interval seconds on a daemon thread."""
+        def run():
+            while not self._stop.wait(interval):
+                self.dump(path)
+
+        self._dump_thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        self._dump_thread.start()
+
+    def serve(self, port=METRICS_PORT, host="127.0.0.1"):
+        """Serve GET /metrics on a daemon thread. Returns the bound port."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server.server_port
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+# shared by every instrumented module
+METRICS = MetricsRegistry()